@@ -1,11 +1,20 @@
 import calendar
-from flask import Flask, render_template, request
-from panchang_engine import fetch_panchang, get_location, fetch_month_day_data, get_monthly_muhurthas, get_horoscope_by_birth_details, get_location
+import os
+from flask import Flask, render_template, request, Response, stream_with_context, abort
+import panchang_engine
+from panchang_engine import fetch_panchang, get_location, get_month_days, get_monthly_muhurthas, Deadline, get_horoscope_by_birth_details, warmup, resolve_ayanamsa, AYANAMSAS, SUPPORTED_YEARS
+from export import iter_export, EXPORT_FORMATS
+from page_cache import PageCache, page_etag, normalize_location
+from live import LiveHub
 from datetime import datetime
 import pytz
 
 app = Flask(__name__)
 
+# Workers open ephemeris files and build lookup tables before taking traffic
+if os.environ.get('PANCHANG_WARMUP', '1') != '0':
+    warmup(timezone_finder=True, city_index=True)
+
 # --- HARDCODED FALLBACK (No API Call) ---
 def get_default_location_data():
     return {
@@ -15,24 +24,62 @@ def get_default_location_data():
         'tz': pytz.timezone('Asia/Kolkata')
     }
 
+# Rendered pages keyed by ETag (see page_cache.py); PAGE_CACHE_SIZE=0 disables
+PAGE_CACHE = PageCache(int(os.environ.get('PAGE_CACHE_SIZE', 256)))
+PAGE_MAX_AGE = 86400
+
+# Seconds the month and muhurtha views may compute before returning what is done
+VIEW_BUDGET_S = float(os.environ.get('VIEW_BUDGET_S', 10))
+
+def cached_page(view, inputs, render, explicit=True):
+    # render() -> (html, cacheable). Pages whose inputs were defaulted from the
+    # clock must be revalidated; pages with an error are neither cached nor tagged.
+    etag = page_etag(view, inputs, (panchang_engine.EPHEMERIS_MODE, panchang_engine.LOCATION_GRID_DEG))
+    cache_control = f"public, max-age={PAGE_MAX_AGE}" if explicit else "no-cache"
+    if request.method in ('GET', 'HEAD') and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        html = PAGE_CACHE.get(etag)
+        if html is None:
+            html, cacheable = render()
+            if not cacheable: return Response(html, mimetype='text/html', headers={"Cache-Control": "no-store"})
+            PAGE_CACHE.put(etag, html)
+        response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def get_requested_location():
+    # lat=..&lon=.. (GPS clients) take precedence over the location name; both
+    # go through get_location, which names coordinates offline
+    lat, lon = request.values.get('lat'), request.values.get('lon')
+    if lat and lon: return f"{lat.strip()},{lon.strip()}"
+    return request.values.get('location')
+
+def get_requested_ayanamsa():
+    # ?ayanamsa=raman or the form field; unknown names fall back to the default
+    try: return resolve_ayanamsa(request.values.get('ayanamsa'))
+    except ValueError: return resolve_ayanamsa()
+
 @app.route('/', methods=['GET', 'POST'])
 def home():
     # Default: Use Hardcoded Data initially to save API calls
-    loc_data = get_default_location_data()
-    location_name = loc_data['name']
-    
+    location_name = get_default_location_data()['name']
     date = datetime.now().strftime("%Y-%m-%d")
-    error = None
-    is_first_load = False
-    
-    if request.method == 'POST':
-        user_loc = request.form.get('location')
-        user_date = request.form.get('date')
-        
-        if user_loc and user_date:
-            date = user_date
-            location_name = user_loc
-            
+    ayanamsa = get_requested_ayanamsa()
+    # The form posts; links such as /?location=...&date=... use the query string
+    user_loc = get_requested_location()
+    user_date = request.values.get('date')
+    submitted = request.method == 'POST' or bool(user_loc or user_date)
+    explicit = bool(submitted and user_loc and user_date)
+    if explicit:
+        date = user_date
+        location_name = user_loc
+
+    def render():
+        loc_data = get_default_location_data()
+        error = None
+        if explicit:
             # Try finding user location
             fetched_loc = get_location(user_loc)
             if fetched_loc:
@@ -40,123 +87,118 @@ def home():
             else:
                 # If fail, keep default but show error
                 error = f"Could not find '{user_loc}'. Using default."
-        else:
+        elif submitted:
             error = "Please provide both location and date."
-    else:
-        is_first_load = True
 
-    try:
-        # Pass the DICTIONARY, not the string
-        data = fetch_panchang(loc_data, date)
-        if "error" in data:
-            error = data["error"]
+        try:
+            # Pass the DICTIONARY, not the string
+            data = fetch_panchang(loc_data, date, ayanamsa)
+            if "error" in data:
+                error = data["error"]
+                data = None
+        except Exception as e:
+            error = str(e)
             data = None
-    except Exception as e:
-        error = str(e)
-        data = None
 
-    return render_template('home.html', 
-                           data=data, 
-                           today=date, 
-                           location_val=location_name, 
-                           error=error, 
-                           is_first_load=is_first_load)
+        html = render_template('home.html',
+                               data=data,
+                               today=date,
+                               location_val=location_name,
+                               error=error,
+                               is_first_load=not submitted,
+                               ayanamsa=ayanamsa,
+                               ayanamsas=AYANAMSAS)
+        return html, error is None
+
+    inputs = {"location": normalize_location(location_name), "date": date, "ayanamsa": ayanamsa, "first_load": not submitted}
+    return cached_page("home", inputs, render, explicit)
+
+def get_requested_month():
+    # month_year=YYYY-MM from the form or the query string; defaults to this month
+    ym_str = request.values.get('month_year')
+    if ym_str:
+        try:
+            year, month = map(int, ym_str.split('-'))
+        except ValueError:
+            abort(400, "month_year must be YYYY-MM")
+        if not (1 <= month <= 12 and SUPPORTED_YEARS[0] <= year <= SUPPORTED_YEARS[1]):
+            abort(400, f"month_year must be a month between {SUPPORTED_YEARS[0]} and {SUPPORTED_YEARS[1]}")
+        return year, month, True
+    today = datetime.now()
+    return today.year, today.month, False
 
 @app.route('/month', methods=['GET', 'POST'])
 def monthly_view():
-    today = datetime.now()
-    year = today.year
-    month = today.month
-    
+    year, month, explicit = get_requested_month()
     # Start with Hardcoded Default
-    loc_data = get_default_location_data()
-    loc_name_display = loc_data['name']
+    req_loc = get_requested_location()
+    ayanamsa = get_requested_ayanamsa()
 
-    if request.method == 'POST':
-        if request.form.get('month_year'):
-            ym_str = request.form.get('month_year')
-            year, month = map(int, ym_str.split('-'))
-        
-        if request.form.get('location'):
-            req_loc = request.form.get('location')
+    def render():
+        loc_data = get_default_location_data()
+        loc_name_display = loc_data['name']
+        found = True
+        if req_loc:
             # Try fetching new location
             found_loc = get_location(req_loc)
             if found_loc:
                 loc_data = found_loc
                 loc_name_display = req_loc
             # If not found, it silently falls back to Bangalore (loc_data remains default)
+            found = found_loc is not None
 
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-    calendar_data = []
-    
-    for week in cal:
-        week_data = []
-        for day in week:
-            if day == 0:
-                week_data.append(None)
-            else:
-                date_str = f"{year}-{month:02d}-{day:02d}"
-                try:
-                    # USE LITE FUNCTION with VALID LOC DATA
-                    day_data = fetch_month_day_data(loc_data, date_str)
-                    
-                    day_info = {
-                        "day": day,
-                        "date_str": date_str,
-                        **day_data
-                    }
-                    week_data.append(day_info)
-                except Exception as e:
-                    print(f"Error for {date_str}: {e}")
-                    week_data.append({"day": day, "error": True})
-        
-        calendar_data.append(week_data)
+        cal = calendar.monthcalendar(year, month)
+        month_name = calendar.month_name[month]
+        # USE LITE FUNCTION with VALID LOC DATA; days past the budget come back pending
+        days = get_month_days(loc_data, year, month, ayanamsa, Deadline(VIEW_BUDGET_S))
+        calendar_data = [[None if day == 0 else {"day": day, "date_str": f"{year}-{month:02d}-{day:02d}", **days[day]} for day in week] for week in cal]
+        pending = sum(1 for d in days.values() if d.get("pending"))
+        complete = found and not any(d.get("pending") or d.get("error") for d in days.values())
+
+        html = render_template('month.html',
+                               calendar_data=calendar_data,
+                               month_name=month_name,
+                               year=year,
+                               location=loc_name_display,
+                               current_ym=f"{year}-{month:02d}",
+                               pending=pending)
+        return html, complete
 
-    return render_template('month.html', 
-                           calendar_data=calendar_data, 
-                           month_name=month_name, 
-                           year=year, 
-                           location=loc_name_display, 
-                           current_ym=f"{year}-{month:02d}")
+    inputs = {"location": normalize_location(req_loc), "year": year, "month": month, "ayanamsa": ayanamsa}
+    return cached_page("month", inputs, render, explicit)
 
 
 @app.route('/muhurtha', methods=['GET', 'POST'])
 def muhurtha_view():
-    today = datetime.now()
-    year = today.year
-    month = today.month
-    
+    year, month, explicit = get_requested_month()
     # Default Location Logic (Same as other pages)
-    loc_name = "Bangalore, India"
-    loc_data = {
-        'name': "Bangalore, India",
-        'lat': 12.9716,
-        'lon': 77.5946,
-        'tz': pytz.timezone('Asia/Kolkata')
-    }
+    req_loc = get_requested_location()
+    loc_name = req_loc or "Bangalore, India"
+    ayanamsa = get_requested_ayanamsa()
 
-    if request.method == 'POST':
-        if request.form.get('month_year'):
-            ym_str = request.form.get('month_year')
-            year, month = map(int, ym_str.split('-'))
-        
-        if request.form.get('location'):
-            loc_name = request.form.get('location')
+    def render():
+        loc_data = get_default_location_data()
+        found = True
+        if req_loc:
             found_loc = get_location(loc_name)
             if found_loc:
                 loc_data = found_loc
+            found = found_loc is not None
+
+        # Calculate Muhurthas
+        muhurtha_data = get_monthly_muhurthas(loc_data, year, month, ayanamsa, Deadline(VIEW_BUDGET_S))
+        month_name = calendar.month_name[month]
 
-    # Calculate Muhurthas
-    muhurtha_data = get_monthly_muhurthas(loc_data, year, month)
-    month_name = calendar.month_name[month]
+        html = render_template('muhurtha.html',
+                               muhurtha_data=muhurtha_data,
+                               month_name=month_name,
+                               year=year,
+                               location=loc_name,
+                               current_ym=f"{year}-{month:02d}")
+        return html, found and not (muhurtha_data["pending"] or muhurtha_data["tripushkara_pending"])
 
-    return render_template('muhurtha.html', 
-                           muhurtha_data=muhurtha_data, 
-                           month_name=month_name, 
-                           year=year, 
-                           location=loc_name, 
-                           current_ym=f"{year}-{month:02d}")
+    inputs = {"location": normalize_location(loc_name), "year": year, "month": month, "ayanamsa": ayanamsa}
+    return cached_page("muhurtha", inputs, render, explicit)
 
 
 
@@ -166,18 +208,19 @@ def horoscope_view():
     birth_time = ""
     city_name = "Bangalore, India" # Default
     data = None
+    ayanamsa = get_requested_ayanamsa()
     
     if request.method == 'POST':
         birth_date = request.form.get('birth_date')
         birth_time = request.form.get('birth_time')
-        city_name = request.form.get('location')
+        city_name = get_requested_location()
         
         if birth_date and birth_time and city_name:
             # Get Coords
             loc = get_location(city_name)
             if loc:
                 # Calculate using local Swiss Ephemeris (100% Accurate)
-                data = get_horoscope_by_birth_details(loc, birth_date, birth_time)
+                data = get_horoscope_by_birth_details(loc, birth_date, birth_time, ayanamsa=ayanamsa)
             
             # (Optional) Add dummy predictions based on Sign
             # Real predictions would require a massive database
@@ -190,7 +233,54 @@ def horoscope_view():
                 }
 
     return render_template('horoscope.html', data=data, 
-                           birth_date=birth_date, birth_time=birth_time, location=city_name)
+                           birth_date=birth_date, birth_time=birth_time, location=city_name,
+                           ayanamsa=ayanamsa, ayanamsas=AYANAMSAS)
+
+
+@app.route('/export/<fmt>', methods=['GET'])
+def export_view(fmt):
+    if fmt not in EXPORT_FORMATS: abort(404)
+    loc_data = get_default_location_data()
+    if get_requested_location():
+        found_loc = get_location(get_requested_location())
+        if not found_loc: abort(400, "Location not found")
+        loc_data = found_loc
+    try:
+        start = datetime.strptime(request.args.get('start', ''), "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get('end', ''), "%Y-%m-%d").date()
+    except ValueError:
+        abort(400, "start and end must be YYYY-MM-DD")
+    if end < start: abort(400, "end is before start")
+    try:
+        ayanamsa = resolve_ayanamsa(request.args.get('ayanamsa'))
+    except ValueError as e:
+        abort(400, str(e))
+
+    # Streamed chunk by chunk; nothing is rendered up front
+    return Response(stream_with_context(iter_export(fmt, loc_data, start, end, ayanamsa)),
+                    mimetype=EXPORT_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename=panchang_{start}_{end}.{fmt}"})
+
+
+# One channel per location, shared by every open /live stream
+LIVE_HUB = LiveHub()
+
+@app.route('/live', methods=['GET'])
+def live_view():
+    # Server-sent events with the current tithi, nakshatra, hora, kalam, ...;
+    # an event on connect and then one at each boundary instant
+    loc_data = get_default_location_data()
+    if get_requested_location():
+        found_loc = get_location(get_requested_location())
+        if not found_loc: abort(400, "Location not found")
+        loc_data = found_loc
+    try:
+        ayanamsa = resolve_ayanamsa(request.args.get('ayanamsa'))
+    except ValueError as e:
+        abort(400, str(e))
+    return Response(stream_with_context(LIVE_HUB.channel(loc_data, ayanamsa).stream()),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,117 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+import pytz
+from panchang_store import PanchangStore
+
+# ================= BULK PRECOMPUTE CLI =================
+# Work is split into (location, year) shards, each written to its own file
+# under <out>/<name-slug>_<lat>_<lon>/<year>.<fmt>. Completed shards are
+# appended to <out>/manifest.jsonl, so an interrupted run picks up where it
+# stopped. With --format npy the output directory is a columnar store that the
+# web app reads when PANCHANG_STORE_PATH points at it.
+#
+#   python bulk_generate.py --locations cities.csv --start 1950-01-01 --end 2049-12-31 --out precomputed --workers 8
+#
+# The locations file is a CSV with name,lat,lon,tz columns.
+
+MANIFEST_NAME = "manifest.jsonl"
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def read_locations(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{"name": r['name'], "lat": float(r['lat']), "lon": float(r['lon']), "tz": r['tz']} for r in csv.DictReader(f)]
+
+def plan_shards(locations, start, end, fmt):
+    shards = []
+    for loc in locations:
+        for year in range(start.year, end.year + 1):
+            s, e = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+            # Names repeat (two Aurangabads), so shards are keyed by coordinates;
+            # the slug only makes csv/ndjson directories readable
+            loc_key = PanchangStore.location_key(loc['lat'], loc['lon'])
+            loc_dir = loc_key if fmt == "npy" else f"{slugify(loc['name'])}_{loc_key}"
+            path = os.path.join(loc_dir, f"{year}.{fmt}")
+            shards.append({"key": f"{loc_dir}:{s}:{e}:{fmt}", "location": loc, "start": s.isoformat(), "end": e.isoformat(), "path": path})
+    return shards
+
+def read_manifest(out_dir):
+    done = set()
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path): return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try: done.add(json.loads(line)['key'])
+            except (ValueError, KeyError): continue  # torn last line from a killed run
+    return done
+
+def run_shard(shard, out_dir, fmt):
+    from export import iter_csv, iter_ndjson
+    loc = dict(shard['location'], tz=pytz.timezone(shard['location']['tz']))
+    start, end = date.fromisoformat(shard['start']), date.fromisoformat(shard['end'])
+    target = os.path.join(out_dir, shard['path'])
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".part"
+    t0 = time.time()
+    if fmt == "npy":
+        from panchang_engine import build_store_rows
+        PanchangStore(out_dir).write_days(loc['lat'], loc['lon'], start, build_store_rows(loc, start, end))
+        return {"key": shard['key'], "path": shard['path'], "days": (end - start).days + 1, "seconds": round(time.time() - t0, 3), "completed_at": datetime.now(pytz.utc).isoformat()}
+    try:
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            for chunk in (iter_csv if fmt == "csv" else iter_ndjson)(loc, start, end): f.write(chunk)
+            # The manifest line is fsynced; the data it vouches for must be on disk first
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    # Only a fully written shard ever appears under its final name
+    os.replace(tmp, target)
+    return {"key": shard['key'], "path": shard['path'], "days": (end - start).days + 1, "seconds": round(time.time() - t0, 3), "completed_at": datetime.now(pytz.utc).isoformat()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute daily panchang data for many locations and years.")
+    parser.add_argument("--locations", required=True, help="CSV file with name,lat,lon,tz columns")
+    parser.add_argument("--start", required=True, help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="last date, YYYY-MM-DD")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--format", choices=["ndjson", "csv", "npy"], default="ndjson")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and recompute every shard")
+    args = parser.parse_args(argv)
+
+    start, end = date.fromisoformat(args.start), date.fromisoformat(args.end)
+    os.makedirs(args.out, exist_ok=True)
+    shards = plan_shards(read_locations(args.locations), start, end, args.format)
+    done = set() if args.force else read_manifest(args.out)
+    pending = [s for s in shards if s['key'] not in done]
+    print(f"{len(shards)} shards, {len(shards) - len(pending)} already complete, {len(pending)} to run", file=sys.stderr)
+
+    failed = 0
+    with open(os.path.join(args.out, MANIFEST_NAME), 'a', encoding='utf-8') as manifest, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_shard, s, args.out, args.format): s for s in pending}
+        for n, fut in enumerate(as_completed(futures), 1):
+            shard = futures[fut]
+            try:
+                entry = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{n}/{len(pending)}] FAILED {shard['key']}: {e}", file=sys.stderr)
+                continue
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            print(f"[{n}/{len(pending)}] {entry['key']} ({entry['seconds']}s)", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# ================= VIMSHOTTARI DASHA =================
+# The 120-year tree is never materialised: periods are generated on demand,
+# point lookups walk one branch per level and range queries only descend into
+# subtrees that overlap the requested window.
+
+DASHA_LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+DASHA_YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+DASHA_LEVELS = ["Maha", "Antar", "Pratyantar", "Sookshma", "Prana"]
+DASHA_TOTAL_YEARS = 120
+DASHA_YEAR_DAYS = 365.25
+NAK_SPAN = 360.0 / 27
+
+def get_dasha_start(moon_long, birth_jd):
+    nak_idx = int((moon_long % 360) / NAK_SPAN)
+    lord = nak_idx % 9
+    elapsed = (moon_long % NAK_SPAN) / NAK_SPAN
+    return lord, birth_jd - elapsed * DASHA_YEARS[lord] * DASHA_YEAR_DAYS
+
+def _make_period(lords, start, end):
+    return {
+        "level": len(lords), "level_name": DASHA_LEVELS[len(lords) - 1] if len(lords) <= len(DASHA_LEVELS) else f"Level {len(lords)}",
+        "lords": tuple(DASHA_LORDS[l] for l in lords), "name": "/".join(DASHA_LORDS[l] for l in lords),
+        "index": lords[-1], "start": start, "end": end
+    }
+
+def _maha_periods(first_lord, start):
+    lord, s = first_lord, start
+    while True:
+        e = s + DASHA_YEARS[lord] * DASHA_YEAR_DAYS
+        yield (lord,), s, e
+        lord, s = (lord + 1) % 9, e
+
+def _sub_periods(lords, start, end):
+    length = end - start
+    s = start
+    for i in range(9):
+        lord = (lords[-1] + i) % 9
+        e = end if i == 8 else s + length * DASHA_YEARS[lord] / DASHA_TOTAL_YEARS
+        yield lords + (lord,), s, e
+        s = e
+
+def _expand(lords, start, end, depth, win_start, win_end):
+    yield _make_period(lords, start, end)
+    if len(lords) >= depth: return
+    for sub_lords, s, e in _sub_periods(lords, start, end):
+        if e <= win_start: continue
+        if s >= win_end: break
+        yield from _expand(sub_lords, s, e, depth, win_start, win_end)
+
+def dasha_range(moon_long, birth_jd, start_jd, end_jd, depth=3):
+    first_lord, dasha_start = get_dasha_start(moon_long, birth_jd)
+    for lords, s, e in _maha_periods(first_lord, dasha_start):
+        if s >= end_jd: break
+        if e <= start_jd: continue
+        yield from _expand(lords, s, e, depth, start_jd, end_jd)
+
+def iter_dasha(moon_long, birth_jd, depth=3, cycles=1):
+    first_lord, dasha_start = get_dasha_start(moon_long, birth_jd)
+    end_jd = dasha_start + cycles * DASHA_TOTAL_YEARS * DASHA_YEAR_DAYS
+    return dasha_range(moon_long, birth_jd, dasha_start, end_jd, depth)
+
+def dasha_at(moon_long, birth_jd, jd, depth=5):
+    first_lord, dasha_start = get_dasha_start(moon_long, birth_jd)
+    if jd < dasha_start: return []
+    cycle_days = DASHA_TOTAL_YEARS * DASHA_YEAR_DAYS
+    cycle_start = dasha_start + ((jd - dasha_start) // cycle_days) * cycle_days
+    path = []
+    candidates = _sub_periods((first_lord,), cycle_start, cycle_start + cycle_days)
+    # The first level is the whole cycle split by the maha lords, so it reuses _sub_periods
+    candidates = (((l[-1],), s, e) for l, s, e in candidates)
+    while len(path) < depth:
+        for lords, s, e in candidates:
+            if s <= jd < e: break
+        else: break
+        path.append(_make_period(lords, s, e))
+        candidates = _sub_periods(lords, s, e)
+    return path
@@ -0,0 +1,90 @@
+import numpy as np
+
+# ================= DAY DIVISIONS =================
+# Kalams, muhurtas, choghadiya and hora are equal parts of the day (sunrise to
+# sunset) and the night (sunset to next sunrise). Everything here takes arrays
+# of rise/set/next-rise JDs and weekday indices (Python convention, Monday=0),
+# so a month or a year of days is one call. Windows are returned as
+# (days, 2) start/end arrays; rows with a missing sunrise come out as NaN.
+
+# Kalam slot (1-8 of the day) per weekday
+RAHU_SLOT = np.array([2, 7, 5, 6, 4, 3, 8])
+YAMA_SLOT = np.array([4, 3, 2, 1, 7, 6, 5])
+GULI_SLOT = np.array([6, 5, 4, 3, 2, 1, 7])
+KALAM_SLOTS = {"rahu": RAHU_SLOT, "yama": YAMA_SLOT, "guli": GULI_SLOT}
+
+# Dur muhurtam: day muhurtas (1-15) per weekday, 0 pads the single-window days
+DUR_SLOTS = np.array([[8, 9], [2, 4], [8, 0], [5, 12], [4, 9], [1, 0], [14, 0]])
+
+# Hora lords in descending (Chaldean) order; each day's first hora belongs to its weekday lord
+HORA_LORDS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+WEEKDAY_LORD = np.array([6, 2, 5, 1, 4, 0, 3])
+
+# Choghadiya named by lord, same order as HORA_LORDS
+CHOGHADIYA_NAMES = ["Kaal", "Shubh", "Rog", "Udveg", "Char", "Labh", "Amrit"]
+CHOGHADIYA_GOOD = np.array([False, True, False, False, True, True, True])
+
+GHATI = 1.0 / 60  # days
+
+def _window(start, length):
+    return np.stack([start, start + length], axis=-1)
+
+def split_day(rise, set_, rise_next, parts):
+    # Boundaries of `parts` equal day segments followed by `parts` night segments: (days, 2 * parts + 1)
+    rise, set_, rise_next = (np.asarray(a, dtype=np.float64) for a in (rise, set_, rise_next))
+    frac = np.arange(parts + 1) / parts
+    day = rise[:, None] + frac * (set_ - rise)[:, None]
+    night = set_[:, None] + frac[1:] * (rise_next - set_)[:, None]
+    return np.concatenate([day, night], axis=1)
+
+def get_kalams(rise, set_, weekday):
+    rise, set_, weekday = np.asarray(rise, dtype=np.float64), np.asarray(set_, dtype=np.float64), np.asarray(weekday)
+    kalam = (set_ - rise) / 8
+    return {name: _window(rise + (slots[weekday] - 1) * kalam, kalam) for name, slots in KALAM_SLOTS.items()}
+
+def get_muhurtas(rise, set_, rise_next, weekday):
+    rise, set_, rise_next = (np.asarray(a, dtype=np.float64) for a in (rise, set_, rise_next))
+    day_m = (set_ - rise) / 15
+    night_m = (rise_next - set_) / 15
+    slots = DUR_SLOTS[np.asarray(weekday)]
+    dur_start = rise[:, None] + (slots - 1) * day_m[:, None]
+    dur = np.where((slots > 0)[..., None], _window(dur_start, day_m[:, None]), np.nan)
+    return {
+        "brahma": _window(rise - 2 * night_m, night_m),
+        "pratah": np.stack([rise - 2 * night_m, rise], axis=-1),
+        "abhijit": _window(rise + 7 * day_m, day_m),
+        "vijaya": _window(rise + 10 * day_m, day_m),
+        "godhuli": _window(set_ - 12.0 / (24 * 60), 24.0 / (24 * 60)),
+        "sayahna": _window(set_, night_m),
+        "nishita": _window(set_ + 7 * night_m, night_m),
+        "dur_day": dur,
+    }
+
+def get_choghadiya(rise, set_, rise_next, weekday):
+    bounds = split_day(rise, set_, rise_next, 8)
+    first = WEEKDAY_LORD[np.asarray(weekday)][:, None]
+    # Day runs forward through the lords from the weekday lord; night starts five on and steps back two
+    day = (first + np.arange(8)) % 7
+    night = (first + 5 - 2 * np.arange(8)) % 7
+    lord = np.concatenate([day, night], axis=1)
+    return {"start": bounds[:, :-1], "end": bounds[:, 1:], "lord": lord, "good": CHOGHADIYA_GOOD[lord]}
+
+def get_horas(rise, set_, rise_next, weekday):
+    bounds = split_day(rise, set_, rise_next, 12)
+    lord = (WEEKDAY_LORD[np.asarray(weekday)][:, None] + np.arange(24)) % 7
+    return {"start": bounds[:, :-1], "end": bounds[:, 1:], "lord": lord}
+
+def get_nakshatra_windows(nak_start, nak_idx, offsets_ghati, length_ghati=4):
+    # Varjyam/Amrit: a fixed number of ghatis after the nakshatra begins
+    start = np.asarray(nak_start, dtype=np.float64) + np.asarray(offsets_ghati)[np.asarray(nak_idx)] * GHATI
+    return _window(start, length_ghati * GHATI)
+
+def day_divisions(rise, set_, rise_next, weekday):
+    rise, set_, rise_next = (np.atleast_1d(np.asarray(a, dtype=np.float64)) for a in (rise, set_, rise_next))
+    weekday = np.atleast_1d(np.asarray(weekday, dtype=np.intp))
+    return {
+        **get_kalams(rise, set_, weekday),
+        **get_muhurtas(rise, set_, rise_next, weekday),
+        "choghadiya": get_choghadiya(rise, set_, rise_next, weekday),
+        "hora": get_horas(rise, set_, rise_next, weekday),
+    }
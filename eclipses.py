@@ -0,0 +1,103 @@
+import argparse
+import sys
+import numpy as np
+import swisseph as swe
+
+# ================= ECLIPSE (GRAHAN) INDEX =================
+# Global eclipse searches cost milliseconds each, far too much per page. The
+# index holds every solar and lunar eclipse over a span (global maximum,
+# begin/end and type), so a date range is a searchsorted away from its
+# handful of candidates; only those get the local search for contact times
+# and visibility. 400 years is ~1800 rows.
+#
+#   python eclipses.py --start 1800 --end 2200 --out ephe/eclipse_index.npz
+
+SOLAR, LUNAR = 0, 1
+ECLIPSE_DTYPE = np.dtype([("jd_max", "f8"), ("jd_begin", "f8"), ("jd_end", "f8"), ("body", "i1"), ("type", "i4")])
+GRAHAN_NAMES = {SOLAR: "Surya Grahan", LUNAR: "Chandra Grahan"}
+# Checked in this order: a hybrid eclipse also carries the total/annular bits.
+# Index rows hold the global type, local circumstances the type seen locally
+ECLIPSE_TYPES = [(swe.ECL_ANNULAR_TOTAL, "Hybrid"), (swe.ECL_TOTAL, "Total"), (swe.ECL_ANNULAR, "Annular"), (swe.ECL_PARTIAL, "Partial"), (swe.ECL_PENUMBRAL, "Penumbral")]
+# Sutak runs from this many hours before the first (umbral) contact to the last
+SUTAK_HOURS = {SOLAR: 12, LUNAR: 9}
+
+def eclipse_type_name(flags):
+    for bit, name in ECLIPSE_TYPES:
+        if flags & bit == bit: return name
+    return ""
+
+def build_eclipse_index(start_jd, end_jd, flags=swe.FLG_SWIEPH):
+    rows = []
+    for body, search, begin_end in ((SOLAR, swe.sol_eclipse_when_glob, (2, 3)), (LUNAR, swe.lun_eclipse_when, (6, 7))):
+        jd = start_jd
+        while True:
+            kind, tret = search(jd, flags)
+            if tret[0] >= end_jd: break
+            rows.append((tret[0], tret[begin_end[0]], tret[begin_end[1]], body, kind))
+            jd = tret[0] + 20
+    index = np.array(rows, dtype=ECLIPSE_DTYPE)
+    return index[np.argsort(index['jd_max'])]
+
+def candidate_rows(index, start_jd, end_jd, margin=0.0):
+    # Rows whose [begin - margin, end] overlaps the range; maxima are sorted and eclipses last hours
+    lo = np.searchsorted(index['jd_max'], start_jd - 1.0)
+    hi = np.searchsorted(index['jd_max'], end_jd + margin + 1.0)
+    rows = np.arange(lo, hi)
+    return rows[(index['jd_end'][rows] >= start_jd) & (index['jd_begin'][rows] - margin <= end_jd)]
+
+def local_circumstances(body, jd_begin, jd_max, lat, lon, flags=swe.FLG_SWIEPH):
+    # Local contacts for one index row; None when it is not visible from (lat, lon)
+    geopos = (float(lon), float(lat), 0.0)
+    search = swe.sol_eclipse_when_loc if body == SOLAR else swe.lun_eclipse_when_loc
+    try: kind, tret, attr = search(jd_begin - 0.5, geopos, flags)
+    except swe.Error: return None
+    # The local search moves on to the next visible eclipse when this one is not
+    if not kind & swe.ECL_VISIBLE or abs(tret[0] - jd_max) > 0.5: return None
+    if body == SOLAR:
+        # Contacts with the Sun below the horizon come back as 0; sunrise/sunset stand in
+        begin, peak, end, magnitude = tret[1] or tret[5], tret[0], tret[4] or tret[6], attr[8]
+        rise_set = tret[5], tret[6]
+    else:
+        # Lunar contacts are the same everywhere; the local search zeroes those below the horizon
+        _, glob = swe.lun_eclipse_when(jd_begin - 0.5, flags)
+        umbral = glob[2] > 0
+        begin, peak, end = (glob[2], glob[0], glob[3]) if umbral else (glob[6], glob[0], glob[7])
+        magnitude = attr[0] if umbral else attr[1]
+        rise_set = tret[8], tret[9]
+    # Rise/set of the eclipsed body during the eclipse bounds the part that can be seen
+    visible_begin = rise_set[0] if rise_set[0] and rise_set[0] > begin else begin
+    visible_end = rise_set[1] if rise_set[1] and rise_set[1] < end else end
+    penumbral = body == LUNAR and not kind & (swe.ECL_PARTIAL | swe.ECL_TOTAL)
+    return {
+        "body": body, "name": GRAHAN_NAMES[body], "type": eclipse_type_name(kind),
+        "begin": begin, "max": peak, "end": end, "visible_begin": visible_begin, "visible_end": visible_end, "magnitude": round(float(magnitude), 3),
+        # Penumbral lunar eclipses are not observed, so they carry no sutak
+        "sutak_start": None if penumbral else begin - SUTAK_HOURS[body] / 24.0,
+        "sutak_end": None if penumbral else end,
+    }
+
+def save_eclipse_index(path, index, start_jd, end_jd):
+    np.savez_compressed(path, index=index, span=np.array([start_jd, end_jd]))
+
+def load_eclipse_index(path):
+    # -> (index, start_jd, end_jd)
+    with np.load(path) as data:
+        return data['index'], float(data['span'][0]), float(data['span'][1])
+
+def main(argv=None):
+    import os
+    parser = argparse.ArgumentParser(description="Build the solar/lunar eclipse index.")
+    parser.add_argument("--start", type=int, required=True, help="first year")
+    parser.add_argument("--end", type=int, required=True, help="last year (inclusive)")
+    parser.add_argument("--out", required=True, help="output .npz file")
+    parser.add_argument("--ephemeris", choices=["swiss", "moshier"], default="swiss", help="search with the .se1 files or the built-in Moshier theory")
+    args = parser.parse_args(argv)
+    swe.set_ephe_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ephe'))
+    start_jd, end_jd = swe.julday(args.start, 1, 1, 0), swe.julday(args.end + 1, 1, 1, 0)
+    index = build_eclipse_index(start_jd, end_jd, swe.FLG_SWIEPH if args.ephemeris == "swiss" else swe.FLG_MOSEPH)
+    save_eclipse_index(args.out, index, start_jd, end_jd)
+    print(f"wrote {args.out} ({len(index)} eclipses)", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+import pytz
+import numpy as np
+from panchang_engine import (
+    TITHIS, NAKSHATRAS, setup_swisseph, jd_from_dt, dt_from_jd, calc_sun_day,
+    get_transition_table, lookup_transitions
+)
+from festival_calendar import get_festival_calendar, get_local_day_span
+from day_division import get_kalams
+
+# ================= STREAMING EXPORT =================
+# Ranges are processed one month at a time and every format is a generator of
+# text chunks, so multi-year exports start immediately and memory stays flat.
+
+EXPORT_FORMATS = {"ics": "text/calendar", "csv": "text/csv", "ndjson": "application/x-ndjson"}
+CSV_COLUMNS = ["date", "sunrise", "sunset", "sun_state", "tithi", "tithi_end", "nakshatra", "nakshatra_end", "rahu_start", "rahu_end", "festivals"]
+
+def iter_month_chunks(start_date, end_date):
+    d = start_date
+    while d <= end_date:
+        nxt = (d.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield d, min(end_date, nxt - timedelta(days=1))
+        d = nxt
+
+def compute_chunk(loc, start_date, end_date, ayanamsa=None):
+    tz = loc['tz']
+    days = (end_date - start_date).days + 1
+    rise_set = np.empty((days + 1, 2))
+    states = []
+    for i in range(days + 1):
+        d = start_date + timedelta(days=i)
+        jd_noon = jd_from_dt(tz.localize(datetime(d.year, d.month, d.day, 12, 0)))
+        rise, set_, state = calc_sun_day(jd_noon, loc['lat'], loc['lon'])
+        rise_set[i] = rise, set_
+        states.append(state)
+    rises, sets = rise_set[:, 0], rise_set[:, 1]
+    span = get_local_day_span(loc, start_date, days + 1)
+    tithis = get_transition_table("tithi", *span)
+    naks = get_transition_table("nakshatra", *span, ayanamsa=ayanamsa)
+    festivals = {}
+    for f in get_festival_calendar(loc, start_date, end_date, ayanamsa, rises, tithis, naks): festivals.setdefault(f['date'], []).append(f['name'])
+    t_rows = lookup_transitions(tithis, rises[:-1])
+    n_rows = lookup_transitions(naks, rises[:-1])
+    rahu = get_kalams(rises[:-1], sets[:-1], [(start_date + timedelta(days=i)).weekday() for i in range(days)])['rahu']
+    records = []
+    for i in range(days):
+        d = start_date + timedelta(days=i)
+        records.append({
+            "date": d.isoformat(), "sunrise": rises[i], "sunset": sets[i], "next_sunrise": rises[i + 1], "sun_state": states[i],
+            "tithi": int(tithis['index'][t_rows[i]]), "tithi_end": tithis['end'][t_rows[i]],
+            "nakshatra": int(naks['index'][n_rows[i]]), "nakshatra_end": naks['end'][n_rows[i]],
+            "rahu_start": rahu[i, 0], "rahu_end": rahu[i, 1], "festivals": festivals.get(d.isoformat(), [])
+        })
+    return records, tithis, naks
+
+def iso_local(jd, tz):
+    return dt_from_jd(float(jd), tz).isoformat()
+
+def format_record(rec, tz):
+    row = dict(rec)
+    for k in ("sunrise", "sunset", "tithi_end", "nakshatra_end", "rahu_start", "rahu_end"): row[k] = iso_local(rec[k], tz)
+    row['tithi'] = TITHIS[rec['tithi']]
+    row['nakshatra'] = NAKSHATRAS[rec['nakshatra']]
+    del row['next_sunrise']
+    return row
+
+def iter_records(loc, start_date, end_date, ayanamsa=None):
+    setup_swisseph()
+    for c_start, c_end in iter_month_chunks(start_date, end_date):
+        records, _, _ = compute_chunk(loc, c_start, c_end, ayanamsa)
+        for rec in records: yield format_record(rec, loc['tz'])
+
+def iter_ndjson(loc, start_date, end_date, ayanamsa=None):
+    for row in iter_records(loc, start_date, end_date, ayanamsa):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+def iter_csv(loc, start_date, end_date, ayanamsa=None):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    month = None
+    for row in iter_records(loc, start_date, end_date, ayanamsa):
+        if month and row['date'][:7] != month:
+            yield buf.getvalue(); buf.seek(0); buf.truncate()
+        month = row['date'][:7]
+        writer.writerow({**row, "festivals": "; ".join(row['festivals'])})
+    yield buf.getvalue()
+
+# --- iCalendar ---
+def ics_escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def fold_line(line):
+    # RFC 5545 3.1: at most 75 octets per line, continued with CRLF + space,
+    # never inside a UTF-8 sequence
+    data = line.encode()
+    if len(data) <= 75: return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80: end -= 1
+        parts.append(data[start:end].decode())
+        start, limit = end, 74
+    parts.append(data[start:].decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+def ics_time(jd):
+    return dt_from_jd(float(jd), pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def ics_event(uid, summary, start, end=None, all_day=False):
+    lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{datetime.now(pytz.utc).strftime('%Y%m%dT%H%M%SZ')}"]
+    if all_day:
+        lines += [f"DTSTART;VALUE=DATE:{start.strftime('%Y%m%d')}", f"DTEND;VALUE=DATE:{(start + timedelta(days=1)).strftime('%Y%m%d')}"]
+    else:
+        lines += [f"DTSTART:{ics_time(start)}", f"DTEND:{ics_time(end)}"]
+    lines += [f"SUMMARY:{ics_escape(summary)}", "END:VEVENT"]
+    return "".join(fold_line(line) for line in lines)
+
+def iter_ics(loc, start_date, end_date, ayanamsa=None):
+    setup_swisseph()
+    slug = f"{loc['lat']:.4f}_{loc['lon']:.4f}"
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Dwara//Vedic Calendar//EN\r\nCALSCALE:GREGORIAN\r\n" + fold_line(f"X-WR-CALNAME:{ics_escape('Panchang - ' + loc['name'])}")
+    emitted_from = None
+    for c_start, c_end in iter_month_chunks(start_date, end_date):
+        records, tithis, naks = compute_chunk(loc, c_start, c_end, ayanamsa)
+        window_start = records[0]['sunrise'] if emitted_from is None else emitted_from
+        window_end = records[-1]['next_sunrise']
+        out = []
+        for kind, table, names in (("tithi", tithis, TITHIS), ("nakshatra", naks, NAKSHATRAS)):
+            first = lookup_transitions(table, [window_start])[0]
+            for row in range(first, len(table['start'])):
+                if table['start'][row] >= window_end: break
+                if emitted_from is not None and table['start'][row] < emitted_from: continue
+                out.append(ics_event(f"{kind}-{table['start'][row]:.5f}-{slug}@dwara", f"{names[table['index'][row]]} ({kind.title()})", table['start'][row], table['end'][row]))
+        for rec in records:
+            day = date.fromisoformat(rec['date'])
+            out.append(ics_event(f"rahu-{rec['date']}-{slug}@dwara", "Rahu Kalam", rec['rahu_start'], rec['rahu_end']))
+            for name in rec['festivals']:
+                out.append(ics_event(f"fest-{rec['date']}-{zlib.crc32(name.encode()):08x}-{slug}@dwara", name, day, all_day=True))
+        emitted_from = window_end
+        yield "".join(out)
+    yield "END:VCALENDAR\r\n"
+
+def iter_export(fmt, loc, start_date, end_date, ayanamsa=None):
+    return {"ics": iter_ics, "csv": iter_csv, "ndjson": iter_ndjson}[fmt](loc, start_date, end_date, ayanamsa)
@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+from panchang_engine import (
+    GREGORIAN_FESTIVALS, setup_swisseph, jd_from_dt, calc_sun_rise_set,
+    get_transition_table, lookup_transitions, get_lunar_month_details, get_annual_festival_name,
+    get_masik_tithi_festivals, get_masik_nakshatra_festivals, get_festival_image_url, get_eclipses
+)
+
+# ================= YEARLY FESTIVAL CALENDAR =================
+# One pass over the year's tithi and nakshatra intervals instead of a full
+# day computation per date. A tithi is observed on the first day whose sunrise
+# it spans; a tithi that never spans a sunrise (kshaya) is observed on the day
+# it occurs in, and one spanning two sunrises (vriddhi) only on the first.
+
+def get_sunrises(loc, start_date, days):
+    tz = loc['tz']
+    rises = np.empty(days)
+    for i in range(days):
+        d = start_date + timedelta(days=i)
+        jd_noon = jd_from_dt(tz.localize(datetime(d.year, d.month, d.day, 12, 0)))
+        rises[i] = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])[0]
+    return rises
+
+def get_local_day_span(loc, start_date, days):
+    # Table bounds come from the calendar, not from sunrise values that may be missing
+    first = jd_from_dt(loc['tz'].localize(datetime(start_date.year, start_date.month, start_date.day)))
+    return first - 1, first + days + 1
+
+def assign_to_days(table, rises):
+    # Interval row observed on each day: rows at sunrise plus kshaya rows, each row once
+    at_rise = lookup_transitions(table, rises[:-1])
+    days = [[] for _ in range(len(rises) - 1)]
+    seen = set()
+    for d, row in enumerate(at_rise):
+        if row not in seen: days[d].append(row); seen.add(row)
+        next_row = at_rise[d + 1] if d + 1 < len(at_rise) else lookup_transitions(table, rises[-1:])[0]
+        for kshaya in range(row + 1, next_row):
+            days[d].append(kshaya); seen.add(kshaya)
+    return days
+
+def get_festival_calendar(loc, start_date, end_date, ayanamsa=None, rises=None, tithis=None, naks=None):
+    # rises (days + 1 sunrises) and the tithi/nakshatra tables over
+    # get_local_day_span can be passed in by a caller that already built them
+    setup_swisseph()
+    days = (end_date - start_date).days + 1
+    if rises is None: rises = get_sunrises(loc, start_date, days + 1)
+    if tithis is None or naks is None:
+        span = get_local_day_span(loc, start_date, days + 1)
+        if tithis is None: tithis = get_transition_table("tithi", *span)
+        if naks is None: naks = get_transition_table("nakshatra", *span, ayanamsa=ayanamsa)
+    tithi_days = assign_to_days(tithis, rises)
+    nak_days = assign_to_days(naks, rises)
+
+    festivals = []
+    for d in range(days):
+        day = start_date + timedelta(days=d)
+        names = []
+        def add_fest(name, kind, row=None, table=None):
+            if not name or name in names: return
+            names.append(name)
+            entry = {"date": day.isoformat(), "name": name, "image_url": get_festival_image_url(name), "kind": kind, "sunrise": float(rises[d])}
+            if row is not None: entry.update({"index": int(table['index'][row]), "start": float(table['start'][row]), "end": float(table['end'][row])})
+            festivals.append(entry)
+        for row in tithi_days[d]:
+            # A tithi never straddles a new moon, so its midpoint fixes its lunar month
+            lunar = get_lunar_month_details((tithis['start'][row] + tithis['end'][row]) / 2, ayanamsa)
+            add_fest(get_annual_festival_name(lunar, int(tithis['index'][row])), "annual", row, tithis)
+        add_fest(GREGORIAN_FESTIVALS.get((day.month, day.day)), "gregorian")
+        for row in tithi_days[d]:
+            for name in get_masik_tithi_festivals(int(tithis['index'][row])): add_fest(name, "tithi", row, tithis)
+        for row in nak_days[d]:
+            for name in get_masik_nakshatra_festivals(int(naks['index'][row])): add_fest(name, "nakshatra", row, naks)
+    # Locally visible eclipses, each on the day its maximum falls in
+    for g in get_eclipses(loc['lat'], loc['lon'], rises[0], rises[-1]):
+        d = int(np.searchsorted(rises, g['max'], side='right')) - 1
+        if not 0 <= d < days: continue
+        name = f"{g['name']} ({g['type']})"
+        festivals.append({"date": (start_date + timedelta(days=d)).isoformat(), "name": name, "image_url": get_festival_image_url(name), "kind": "grahan", "sunrise": float(rises[d]), "start": float(g['begin']), "end": float(g['end'])})
+    festivals.sort(key=lambda f: f['date'])
+    return festivals
+
+def get_yearly_festivals(loc, year, ayanamsa=None):
+    return get_festival_calendar(loc, date(year, 1, 1), date(year, 12, 31), ayanamsa)
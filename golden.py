@@ -0,0 +1,179 @@
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+import pytz
+import panchang_engine as pe
+
+# ================= GOLDEN OUTPUT GATE =================
+# Freezes what the engine computes for a seeded spread of dates (1800-2199)
+# and locations (-55 to +70 latitude), then checks a later engine against it
+# within tolerances and reports the speedup per function. Regenerate the
+# golden file only when a change in output is intended.
+#
+#   python golden.py generate --out golden.npz --samples 2000
+#   python golden.py compare --golden golden.npz --tol-s 1
+
+LOCATIONS = [
+    ("Ushuaia", -54.80, -68.30, "America/Argentina/Ushuaia"), ("Sydney", -33.87, 151.21, "Australia/Sydney"),
+    ("Johannesburg", -26.20, 28.05, "Africa/Johannesburg"), ("Lima", -12.05, -77.04, "America/Lima"),
+    ("Singapore", 1.35, 103.82, "Asia/Singapore"), ("Bangalore", 12.97, 77.59, "Asia/Kolkata"),
+    ("Mumbai", 19.08, 72.88, "Asia/Kolkata"), ("Delhi", 28.61, 77.21, "Asia/Kolkata"),
+    ("Kathmandu", 27.72, 85.32, "Asia/Kathmandu"), ("Tokyo", 35.68, 139.69, "Asia/Tokyo"),
+    ("New York", 40.71, -74.01, "America/New_York"), ("London", 51.51, -0.13, "Europe/London"),
+    ("Oslo", 59.91, 10.75, "Europe/Oslo"), ("Reykjavik", 64.15, -21.94, "Atlantic/Reykjavik"),
+    ("Tromso", 69.65, 18.96, "Europe/Oslo"),
+]
+FIRST_DAY, LAST_DAY = date(1800, 1, 1), date(2199, 12, 31)
+MAX_EVENTS = 8
+MAX_LAGNAS = 16
+EVENT_KINDS = {
+    "tithi": (lambda j: (int(pe.elongation(j) / 12), 0), pe.TITHIS, 30, False),
+    "nakshatra": (lambda j: (int(pe.graha_longitude(j, 1) / 13.333333333), 0), pe.NAKSHATRAS, 27, False),
+    "yoga": (lambda j: (int(sum(pe.get_pos(j)) % 360 / 13.333333333), 0), pe.YOGAS, 27, False),
+    "karana": (lambda j: (int(pe.elongation(j) / 6), 0), [], 60, True),
+}
+
+def make_samples(n, seed):
+    rng = np.random.default_rng(seed)
+    span = (LAST_DAY - FIRST_DAY).days
+    return [(LOCATIONS[int(rng.integers(len(LOCATIONS)))], FIRST_DAY + timedelta(days=int(rng.integers(span)))) for _ in range(n)]
+
+def _noon_jd(loc, day):
+    return pe.jd_from_dt(pytz.timezone(loc[3]).localize(datetime(day.year, day.month, day.day, 12, 0)))
+
+def _nan(x):
+    return np.nan if x is None or x == 0 else x
+
+def run_sun(samples):
+    return np.array([[_nan(v) for v in pe.calc_sun_rise_set(_noon_jd(loc, day), loc[1], loc[2])] for loc, day in samples], dtype=np.float64)
+
+def run_moon(samples):
+    return np.array([[_nan(v) for v in pe.calc_moon_rise_set(_noon_jd(loc, day), loc[1], loc[2])] for loc, day in samples], dtype=np.float64)
+
+def _day_span(sun, i):
+    rise = sun[i, 0]
+    return (rise, rise + 1.0) if not np.isnan(rise) else (None, None)
+
+def run_events(samples, sun, kind):
+    func, names, count, is_karana = EVENT_KINDS[kind]
+    out = np.full((len(samples), MAX_EVENTS, 3), np.nan)
+    for i in range(len(samples)):
+        start, end = _day_span(sun, i)
+        for k, e in enumerate(pe.get_events(start, end, func, names, count, is_karana)[:MAX_EVENTS]):
+            out[i, k] = (e['start'], _nan(e['end']), e['index'])
+    return out
+
+def run_lagna(samples, sun):
+    # Sign index and start/end as minutes past local midnight (the engine formats to minutes)
+    out = np.full((len(samples), MAX_LAGNAS, 3), np.nan)
+    for i, (loc, day) in enumerate(samples):
+        start, end = _day_span(sun, i)
+        if start is None: continue
+        for k, lg in enumerate(pe.get_udaya_lagna_details(start, end, pytz.timezone(loc[3]), loc[1], loc[2])[:MAX_LAGNAS]):
+            out[i, k] = (lg['index'], *(_minutes(lg[key]) for key in ('start', 'end')))
+    return out
+
+def _minutes(clock):
+    t = datetime.strptime(clock, "%I:%M %p")
+    return t.hour * 60 + t.minute
+
+def run_tables(samples, sun, kind):
+    # Fast-path boundaries over the 30 days from the sample's sunrise
+    out = np.full((len(samples), 40, 2), np.nan)
+    for i in range(len(samples)):
+        start, _ = _day_span(sun, i)
+        if start is None: continue
+        table = pe.get_transition_table(kind, start, start + 30)
+        k = min(len(table['start']), 40)
+        out[i, :k, 0], out[i, :k, 1] = table['start'][:k], table['index'][:k]
+    return out
+
+def run_all(samples, lagna_every):
+    # -> (results, seconds per function); caches are dropped first so every sample computes
+    pe.setup_swisseph()
+    pe.set_ephemeris_mode(pe.EPHEMERIS_MODE)
+    results, timings = {}, {}
+    def timed(name, func, *args):
+        t0 = time.perf_counter()
+        results[name] = func(*args)
+        timings[name] = time.perf_counter() - t0
+    timed("sun_rise_set", run_sun, samples)
+    timed("moon_rise_set", run_moon, samples)
+    for kind in EVENT_KINDS: timed(f"events_{kind}", run_events, samples, results["sun_rise_set"], kind)
+    sub = samples[::lagna_every]
+    timed("udaya_lagna", run_lagna, sub, results["sun_rise_set"][::lagna_every])
+    for kind in ("tithi", "nakshatra"): timed(f"table_{kind}", run_tables, sub, results["sun_rise_set"][::lagna_every], kind)
+    return results, timings
+
+def compare(golden, current, tol_s, tol_min):
+    # Times are compared in seconds (lagna in minutes, wrapping at midnight); indices and NaN patterns exactly
+    report = {}
+    for name, ref in golden.items():
+        cur = current[name]
+        if cur.shape != ref.shape:
+            report[name] = {"mismatches": int(ref.shape[0]), "error": f"shape {cur.shape} != {ref.shape}"}
+            continue
+        same_nan = np.isnan(ref) == np.isnan(cur)
+        if name.startswith(("events_", "table_", "udaya_")):
+            idx_col = 0 if name == "udaya_lagna" else -1
+            idx_ok = np.isclose(np.nan_to_num(ref[..., idx_col], nan=-1), np.nan_to_num(cur[..., idx_col], nan=-1))
+            times = [c for c in range(ref.shape[-1]) if c != idx_col % ref.shape[-1]]
+            ref_t, cur_t = ref[..., times], cur[..., times]
+        else:
+            idx_ok = np.ones(ref.shape[:1], dtype=bool)
+            ref_t, cur_t = ref, cur
+        diff = np.abs(np.nan_to_num(cur_t) - np.nan_to_num(ref_t))
+        if name == "udaya_lagna":
+            diff = np.minimum(diff, 1440 - diff)
+            tol = tol_min
+        else:
+            diff = diff * 86400
+            tol = tol_s
+        per_sample = lambda a: a.reshape(a.shape[0], -1).all(axis=1)
+        ok = per_sample(same_nan) & per_sample(idx_ok) & per_sample(diff <= tol)
+        report[name] = {"samples": int(ref.shape[0]), "mismatches": int((~ok).sum()),
+                        f"max_error_{'min' if name == 'udaya_lagna' else 's'}": round(float(diff.max()), 3) if diff.size else 0.0}
+        if (~ok).any(): report[name]["first_mismatch_sample"] = int(np.flatnonzero(~ok)[0])
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate or check the golden engine output.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="freeze the current engine output")
+    gen.add_argument("--out", required=True, help="golden .npz file")
+    gen.add_argument("--samples", type=int, default=2000)
+    gen.add_argument("--seed", type=int, default=2024)
+    gen.add_argument("--lagna-every", type=int, default=4, help="lagna and transition tables on every Nth sample (they are slower)")
+    chk = sub.add_parser("compare", help="check the current engine against a golden file")
+    chk.add_argument("--golden", required=True)
+    chk.add_argument("--tol-s", type=float, default=1.0, help="tolerance for transition, rise and set times (seconds)")
+    chk.add_argument("--tol-lagna-min", type=float, default=1.0, help="tolerance for lagna times (minutes, as displayed)")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        samples = make_samples(args.samples, args.seed)
+        results, timings = run_all(samples, args.lagna_every)
+        meta = {"samples": args.samples, "seed": args.seed, "lagna_every": args.lagna_every, "ephemeris_mode": pe.EPHEMERIS_MODE,
+                "ayanamsa": pe.DEFAULT_AYANAMSA, "timings_s": timings, "created": datetime.now(pytz.utc).isoformat()}
+        np.savez_compressed(args.out, meta=json.dumps(meta), **results)
+        print(json.dumps({"wrote": args.out, "timings_s": {k: round(v, 3) for k, v in timings.items()}}, indent=2))
+        return 0
+
+    with np.load(args.golden) as data:
+        meta = json.loads(str(data['meta']))
+        golden = {k: data[k] for k in data.files if k != 'meta'}
+    samples = make_samples(meta['samples'], meta['seed'])
+    current, timings = run_all(samples, meta['lagna_every'])
+    report = compare(golden, current, args.tol_s, args.tol_lagna_min)
+    for name, entry in report.items():
+        base = meta['timings_s'].get(name)
+        entry.update({"baseline_s": round(base, 3), "current_s": round(timings[name], 3), "speedup": round(base / timings[name], 2) if timings[name] else None})
+    passed = all(entry["mismatches"] == 0 for entry in report.values())
+    print(json.dumps({"passed": passed, "golden": {k: meta[k] for k in ("samples", "seed", "ephemeris_mode", "ayanamsa", "created")}, "functions": report}, indent=2))
+    return 0 if passed else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import numpy as np
+
+# ================= INTERVAL ALGEBRA =================
+# Tithi, nakshatra, yoga, weekday and lagna windows as sorted, non-overlapping
+# interval arrays in the transition-table layout: {"start", "end", "index"}.
+# Filters are masks and intersections one merge pass over both inputs, so a
+# combinational yoga over a year costs what it costs over a day, per day.
+# Intersections keep the left operand's index and record which row of each
+# operand produced every piece ("left"/"right"), so names can be recovered.
+
+def make(start, end, index):
+    return {"start": np.asarray(start, dtype=np.float64), "end": np.asarray(end, dtype=np.float64), "index": np.asarray(index, dtype=np.int16)}
+
+def from_events(events, end_jd):
+    # Daily event lists; an event whose end was not found runs to end_jd
+    return make([e['start'] for e in events], [e['end'] or end_jd for e in events], [e['index'] for e in events])
+
+def days(rises, weekday):
+    # Sunrise-to-sunrise days: len(rises) == len(weekday) + 1
+    rises = np.asarray(rises, dtype=np.float64)
+    return make(rises[:-1], rises[1:], weekday)
+
+def where(iv, mask):
+    return {key: val[mask] for key, val in iv.items()}
+
+def select(iv, indices):
+    return where(iv, np.isin(iv['index'], indices))
+
+def clip(iv, start_jd, end_jd):
+    start, end = np.maximum(iv['start'], start_jd), np.minimum(iv['end'], end_jd)
+    keep = start < end
+    return {"start": start[keep], "end": end[keep], "index": iv['index'][keep]}
+
+def intersect(a, b):
+    # Each row of a meets the run of b rows between these two bounds
+    lo = np.searchsorted(b['end'], a['start'], side='right')
+    hi = np.searchsorted(b['start'], a['end'], side='left')
+    counts = np.maximum(hi - lo, 0)
+    left = np.repeat(np.arange(len(a['start'])), counts)
+    right = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    start = np.maximum(a['start'][left], b['start'][right])
+    end = np.minimum(a['end'][left], b['end'][right])
+    keep = start < end
+    return {"start": start[keep], "end": end[keep], "index": a['index'][left[keep]], "left": left[keep], "right": right[keep]}
+
+def intersect_all(*ivs):
+    out = ivs[0]
+    for iv in ivs[1:]: out = intersect(out, iv)
+    return out
@@ -0,0 +1,179 @@
+import functools
+import json
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from panchang_engine import (
+    TITHIS, NAKSHATRAS, YOGAS, setup_swisseph, jd_from_dt, dt_from_jd, calc_sun_rise_set,
+    get_transition_table, lookup_transitions, get_karana_name, resolve_ayanamsa
+)
+from day_division import day_divisions, HORA_LORDS, CHOGHADIYA_NAMES, CHOGHADIYA_GOOD
+
+# ================= LIVE "NOW" STREAM =================
+# A sunrise-to-sunrise day is cut at every instant where one of tithi,
+# nakshatra, yoga, karana, hora, choghadiya or kalam changes, and the state of
+# each piece is computed once. All subscribers to a location share one channel
+# holding that schedule and a single timer, which wakes exactly at the next
+# boundary and notifies them, so a kiosk gets a few dozen events a day instead
+# of polling.
+
+KEEPALIVE_S = 30
+# A failed refresh is retried after RETRY_S, doubling up to RETRY_MAX_S
+RETRY_S, RETRY_MAX_S = 5.0, 300.0
+TABLE_NAMES = {"tithi": TITHIS, "nakshatra": NAKSHATRAS, "yoga": YOGAS, "karana": None}
+
+def now_jd():
+    return jd_from_dt(datetime.now(pytz.utc))
+
+def _sun_rise_set(loc, day):
+    jd_noon = jd_from_dt(loc['tz'].localize(datetime(day.year, day.month, day.day, 12, 0)))
+    return calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
+
+def build_day_schedule(loc, day, ayanamsa=None):
+    # -> {"start", "end", "boundaries", "states"}; states[i] holds on [boundaries[i], boundaries[i + 1])
+    setup_swisseph()
+    tz = loc['tz']
+    rise, set_ = _sun_rise_set(loc, day)
+    rise_next, _ = _sun_rise_set(loc, day + timedelta(days=1))
+    tables = {kind: get_transition_table(kind, rise - 1, rise_next + 1, ayanamsa) for kind in TABLE_NAMES}
+    divisions = day_divisions(rise, set_, rise_next, dt_from_jd(rise, tz).weekday())
+    hora, chog = divisions['hora'], divisions['choghadiya']
+    kalams = {name: divisions[name][0] for name in ('rahu', 'yama', 'guli')}
+
+    cuts = [rise, rise_next, set_, *hora['start'][0], *chog['start'][0], *(t for w in kalams.values() for t in w)]
+    for table in tables.values(): cuts.extend(table['start'])
+    cuts = np.unique(np.array(cuts))
+    cuts = cuts[(cuts >= rise) & (cuts <= rise_next)]
+
+    iso = lambda jd: dt_from_jd(float(jd), tz).isoformat()
+    states = []
+    for t, until in zip(cuts[:-1], cuts[1:]):
+        state = {"day": day.isoformat(), "sunrise": iso(rise), "sunset": iso(set_), "next_sunrise": iso(rise_next), "is_day": bool(t < set_), "until": iso(until)}
+        for kind, names in TABLE_NAMES.items():
+            row = lookup_transitions(tables[kind], t)
+            idx = int(tables[kind]['index'][row])
+            state[kind] = {"name": get_karana_name(idx) if names is None else names[idx], "index": idx, "end": iso(tables[kind]['end'][row])}
+        h = int(np.searchsorted(hora['start'][0], t, side='right')) - 1
+        state["hora"] = {"lord": HORA_LORDS[hora['lord'][0][h]], "end": iso(hora['end'][0][h])}
+        c = int(np.searchsorted(chog['start'][0], t, side='right')) - 1
+        lord = chog['lord'][0][c]
+        state["choghadiya"] = {"name": CHOGHADIYA_NAMES[lord], "is_good": bool(CHOGHADIYA_GOOD[lord]), "end": iso(chog['end'][0][c])}
+        active = [name for name, (s, e) in kalams.items() if s <= t < e]
+        state["kalam"] = {"name": active[0], "end": iso(kalams[active[0]][1])} if active else None
+        states.append(state)
+    return {"start": float(rise), "end": float(rise_next), "boundaries": cuts, "states": states}
+
+@functools.lru_cache(maxsize=512)
+def _cached_schedule(lat, lon, tz_name, day, ayanamsa):
+    return build_day_schedule({"lat": lat, "lon": lon, "tz": pytz.timezone(tz_name)}, day, ayanamsa)
+
+def get_schedule_at(loc, jd, ayanamsa=None):
+    # Schedule of the sunrise-to-sunrise day containing jd
+    tz_name = loc['tz'].zone
+    day = dt_from_jd(jd, loc['tz']).date()
+    for d in (day, day - timedelta(days=1), day + timedelta(days=1)):
+        schedule = _cached_schedule(loc['lat'], loc['lon'], tz_name, d, resolve_ayanamsa(ayanamsa))
+        if schedule['start'] <= jd < schedule['end']: return schedule
+    return schedule
+
+def state_at(schedule, jd):
+    i = int(np.searchsorted(schedule['boundaries'], jd, side='right')) - 1
+    return schedule['states'][min(max(i, 0), len(schedule['states']) - 1)]
+
+def next_boundary(schedule, jd):
+    i = int(np.searchsorted(schedule['boundaries'], jd, side='right'))
+    return float(schedule['boundaries'][min(i, len(schedule['boundaries']) - 1)])
+
+class LiveChannel:
+    # One per location: the current state plus a timer for the next boundary
+    def __init__(self, hub, key, loc, ayanamsa):
+        self.hub, self.key, self.loc, self.ayanamsa = hub, key, loc, ayanamsa
+        self.cond = threading.Condition()
+        self.subscribers = 0
+        self.version = 0
+        self.state = None
+        self.timer = None
+        self.failures = 0
+
+    def _tick(self):
+        # Runs on the timer thread: an exception here would end it with
+        # self.timer still set, and subscribe() would never start another
+        with self.cond:
+            try:
+                self._refresh()
+                self.failures = 0
+            except Exception as e:
+                print(f"Live refresh failed for {self.key}: {e}")
+                self.timer = None
+                if not self.subscribers: return
+                self._schedule(min(RETRY_S * 2 ** self.failures, RETRY_MAX_S))
+                self.failures += 1
+
+    def _schedule(self, delay):
+        self.timer = threading.Timer(delay, self._tick)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _refresh(self):
+        # Called with the condition held (it wraps an RLock)
+        if not self.subscribers:
+            self.timer = None
+            return
+        jd = now_jd()
+        schedule = get_schedule_at(self.loc, jd, self.ayanamsa)
+        state = state_at(schedule, jd)
+        if state is not self.state:
+            self.state = state
+            self.version += 1
+            self.cond.notify_all()
+        # A little past the boundary, so the lookup lands in the new piece
+        self._schedule(max(0.0, (next_boundary(schedule, jd) - jd) * 86400) + 0.05)
+
+    def subscribe(self):
+        with self.cond:
+            self.subscribers += 1
+            if self.timer is None: self._refresh()
+
+    def unsubscribe(self):
+        with self.cond:
+            self.subscribers -= 1
+            if self.subscribers: return
+            if self.timer is not None: self.timer.cancel()
+            self.timer = None
+        self.hub.drop(self.key, self)
+
+    def stream(self):
+        # Server-sent events: the current state on connect, then one event per boundary
+        # subscribe() is inside the try so a failed first refresh still undoes the count
+        try:
+            self.subscribe()
+            seen = None
+            while True:
+                with self.cond:
+                    changed = self.cond.wait_for(lambda: self.version != seen, timeout=KEEPALIVE_S)
+                    state, seen = self.state, self.version
+                if changed: yield f"event: state\ndata: {json.dumps(state)}\n\n"
+                else: yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe()
+
+class LiveHub:
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, loc, ayanamsa=None):
+        ayanamsa = resolve_ayanamsa(ayanamsa)
+        key = (round(loc['lat'], 4), round(loc['lon'], 4), loc['tz'].zone, ayanamsa)
+        with self._lock:
+            ch = self._channels.get(key)
+            if ch is None: ch = self._channels[key] = LiveChannel(self, key, loc, ayanamsa)
+            return ch
+
+    def drop(self, key, ch):
+        with self._lock:
+            if self._channels.get(key) is ch and not ch.subscribers: del self._channels[key]
+
+    def __len__(self):
+        return len(self._channels)
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# ================= LOAD TEST =================
+# Drives the Flask app in-process at a fixed concurrency, with a resolver
+# over fixture cities standing in for Nominatim so no request leaves the
+# machine. Reports latency percentiles, throughput and how many Swiss
+# Ephemeris calls each request made, per route, as JSON.
+#
+#   python load_test.py --requests 400 --concurrency 8
+#   python load_test.py --routes month,muhurtha --page-cache
+
+FIXTURE_CITIES = {
+    "bangalore": {"name": "Bangalore, India", "lat": 12.9716, "lon": 77.5946, "tz": "Asia/Kolkata"},
+    "chennai": {"name": "Chennai, India", "lat": 13.0827, "lon": 80.2707, "tz": "Asia/Kolkata"},
+    "delhi": {"name": "New Delhi, India", "lat": 28.6139, "lon": 77.2090, "tz": "Asia/Kolkata"},
+    "mumbai": {"name": "Mumbai, India", "lat": 19.0760, "lon": 72.8777, "tz": "Asia/Kolkata"},
+    "kolkata": {"name": "Kolkata, India", "lat": 22.5726, "lon": 88.3639, "tz": "Asia/Kolkata"},
+    "kathmandu": {"name": "Kathmandu, Nepal", "lat": 27.7172, "lon": 85.3240, "tz": "Asia/Kathmandu"},
+    "singapore": {"name": "Singapore", "lat": 1.3521, "lon": 103.8198, "tz": "Asia/Singapore"},
+    "london": {"name": "London, United Kingdom", "lat": 51.5074, "lon": -0.1278, "tz": "Europe/London"},
+    "new york": {"name": "New York, United States", "lat": 40.7128, "lon": -74.0060, "tz": "America/New_York"},
+    "sydney": {"name": "Sydney, Australia", "lat": -33.8688, "lon": 151.2093, "tz": "Australia/Sydney"},
+}
+
+ROUTES = ("home", "month", "muhurtha", "horoscope")
+
+# Swiss Ephemeris entry points the engine uses; each call is counted against the request
+COUNTED_CALLS = ("calc_ut", "houses", "houses_ex", "rise_trans", "get_ayanamsa_ut",
+                 "sol_eclipse_when_glob", "sol_eclipse_when_loc", "lun_eclipse_when", "lun_eclipse_when_loc")
+
+def fixture_resolver(name):
+    import pytz
+    city = FIXTURE_CITIES.get(" ".join(name.lower().split()))
+    return dict(city, tz=pytz.timezone(city['tz'])) if city else None
+
+class CallCounter:
+    # Per-thread counts: the test client runs each request on the calling thread
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self, module):
+        for name in COUNTED_CALLS:
+            func = getattr(module, name, None)
+            if func is not None: setattr(module, name, self._wrap(func))
+
+    def _wrap(self, func):
+        def counted(*args, **kwargs):
+            self._local.count = getattr(self._local, 'count', 0) + 1
+            return func(*args, **kwargs)
+        return counted
+
+    def reset(self):
+        self._local.count = 0
+
+    def read(self):
+        return getattr(self._local, 'count', 0)
+
+def make_requests(routes, n, start, days, seed):
+    rng = random.Random(seed)
+    cities = list(FIXTURE_CITIES)
+    out = []
+    for i in range(n):
+        route = routes[i % len(routes)]
+        city = rng.choice(cities)
+        d = start + timedelta(days=rng.randrange(days))
+        if route == "home": out.append((route, "/", {"location": city, "date": d.isoformat()}))
+        elif route == "month": out.append((route, "/month", {"location": city, "month_year": f"{d.year}-{d.month:02d}"}))
+        elif route == "muhurtha": out.append((route, "/muhurtha", {"location": city, "month_year": f"{d.year}-{d.month:02d}"}))
+        else: out.append((route, "/horoscope", {"location": city, "birth_date": (d - timedelta(days=365 * rng.randrange(18, 60))).isoformat(), "birth_time": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"}))
+    return out
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def summarize(samples, wall):
+    ms = [s['ms'] for s in samples]
+    calls = [s['calls'] for s in samples]
+    return {
+        "requests": len(samples), "errors": sum(1 for s in samples if s['status'] >= 400),
+        "rps": round(len(samples) / wall, 2) if wall else None,
+        "latency_ms": {"p50": round(percentile(ms, 50), 1), "p95": round(percentile(ms, 95), 1), "p99": round(percentile(ms, 99), 1), "mean": round(statistics.mean(ms), 1), "max": round(max(ms), 1)},
+        "ephemeris_calls": {"mean": round(statistics.mean(calls), 1), "p95": percentile(calls, 95), "max": max(calls)},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Flask app with fixture cities instead of Nominatim.")
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma-separated subset of {','.join(ROUTES)}")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests, spread round-robin over the routes")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=8, help="unmeasured requests first")
+    parser.add_argument("--start", default=date.today().isoformat(), help="first date requests may ask for")
+    parser.add_argument("--days", type=int, default=365, help="span of requested dates")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--page-cache", action="store_true", help="keep the rendered-page cache on (off by default, so every request computes)")
+    args = parser.parse_args(argv)
+    routes = [r for r in args.routes.split(",") if r]
+    for r in routes:
+        if r not in ROUTES: parser.error(f"unknown route {r}")
+
+    # The app warms up at import unless told not to; the resolver needs no geocoder
+    os.environ.setdefault('PANCHANG_WARMUP', '0')
+    if not args.page_cache: os.environ['PAGE_CACHE_SIZE'] = '0'
+    import swisseph
+    import panchang_engine as pe
+    import app as web
+    pe.set_location_resolver(fixture_resolver)
+    pe.warmup()
+    counter = CallCounter()
+    counter.install(swisseph)
+    client = web.app.test_client()
+
+    def run(req):
+        route, path, form = req
+        counter.reset()
+        t0 = time.perf_counter()
+        status = client.post(path, data=form).status_code
+        return {"route": route, "status": status, "ms": (time.perf_counter() - t0) * 1000, "calls": counter.read()}
+
+    for req in make_requests(routes, args.warmup, date.fromisoformat(args.start), args.days, args.seed + 1): run(req)
+    reqs = make_requests(routes, args.requests, date.fromisoformat(args.start), args.days, args.seed)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        samples = list(pool.map(run, reqs))
+    wall = time.perf_counter() - t0
+
+    report = {
+        "config": {"routes": routes, "requests": args.requests, "concurrency": args.concurrency, "page_cache": args.page_cache,
+                   "ephemeris_mode": pe.EPHEMERIS_MODE, "location_grid_deg": pe.LOCATION_GRID_DEG, "store": pe.PANCHANG_STORE_PATH},
+        "total": dict(summarize(samples, wall), duration_s=round(wall, 2)),
+        # Per-route rps is that route's share of the same wall time
+        "routes": {r: summarize([s for s in samples if s['route'] == r], wall) for r in routes},
+        "budget": pe.get_budget_stats(),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import numpy as np
+from panchang_engine import RASHIS, PADA_NAMES
+
+# ================= ASHTAKOOTA (GUNA MILAN) =================
+# All eight koota scores are precomputed over (boy pada, girl pada) pairs of the
+# 108 nakshatra padas, so matching one profile against N candidates is a single
+# gather from KOOTA_TOTAL.
+
+KOOTAS = ["Varna", "Vashya", "Tara", "Yoni", "Graha Maitri", "Gana", "Bhakoot", "Nadi"]
+KOOTA_MAX = [1, 2, 3, 4, 5, 6, 7, 8]
+PADA_COUNT = 108
+
+# Varna per rashi: 0 Shudra, 1 Vaishya, 2 Kshatriya, 3 Brahmin
+RASHI_VARNA = [2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3]
+
+# Vashya groups: 0 Chatushpada, 1 Manava, 2 Jalachara, 3 Vanachara, 4 Keeta
+# (rashi -> group for the first and second half of the sign)
+RASHI_VASHYA = [(0, 0), (0, 0), (1, 1), (2, 2), (3, 3), (1, 1), (1, 1), (4, 4), (1, 0), (0, 2), (1, 1), (2, 2)]
+VASHYA_TABLE = [
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+]
+
+# Yoni animals: Horse, Elephant, Sheep, Serpent, Dog, Cat, Rat, Cow, Buffalo, Tiger, Deer, Monkey, Mongoose, Lion
+NAK_YONI = [0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1]
+YONI_TABLE = [
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+]
+
+# Rashi lords: 0 Sun, 1 Moon, 2 Mars, 3 Mercury, 4 Jupiter, 5 Venus, 6 Saturn
+RASHI_LORD = [2, 5, 3, 1, 0, 3, 5, 2, 4, 6, 6, 4]
+MAITRI_TABLE = [
+    [5, 5, 5, 4, 5, 0, 0],
+    [5, 5, 4, 1, 4, 0.5, 0.5],
+    [5, 4, 5, 0.5, 5, 3, 0.5],
+    [4, 1, 0.5, 5, 0.5, 5, 4],
+    [5, 4, 5, 0.5, 5, 0.5, 3],
+    [0, 0.5, 3, 5, 0.5, 5, 5],
+    [0, 0.5, 0.5, 4, 3, 5, 5],
+]
+
+# Gana: 0 Deva, 1 Manushya, 2 Rakshasa (rows boy, columns girl)
+NAK_GANA = [0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0]
+GANA_TABLE = [
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6],
+]
+
+# Nadi: 0 Adi, 1 Madhya, 2 Antya (repeats every 6 nakshatras)
+NAK_NADI = [[0, 1, 2, 2, 1, 0][n % 6] for n in range(27)]
+
+def _build_koota_tables():
+    pada = np.arange(PADA_COUNT)
+    nak = pada // 4
+    rashi = pada // 9
+    half = ((pada % 9) * 10.0 / 3.0 >= 15.0).astype(int)
+    b_nak, g_nak = nak[:, None], nak[None, :]
+    b_rashi, g_rashi = rashi[:, None], rashi[None, :]
+
+    varna = np.array(RASHI_VARNA)
+    vashya = np.array(RASHI_VASHYA)[rashi, half]
+    yoni = np.array(NAK_YONI)
+    lord = np.array(RASHI_LORD)
+    gana = np.array(NAK_GANA)
+    nadi = np.array(NAK_NADI)
+
+    tara_ok = lambda d: ~np.isin(d % 9, [2, 4, 6])
+    bhakoot_dist = (b_rashi - g_rashi) % 12 + 1
+    bhakoot_bad = np.isin(bhakoot_dist, [2, 12, 5, 9, 6, 8])
+
+    tables = np.zeros((len(KOOTAS), PADA_COUNT, PADA_COUNT), dtype=np.float32)
+    tables[0] = varna[b_rashi] >= varna[g_rashi]
+    tables[1] = np.array(VASHYA_TABLE)[vashya[:, None], vashya[None, :]]
+    tables[2] = 1.5 * tara_ok(b_nak - g_nak) + 1.5 * tara_ok(g_nak - b_nak)
+    tables[3] = np.array(YONI_TABLE)[yoni[b_nak], yoni[g_nak]]
+    tables[4] = np.array(MAITRI_TABLE)[lord[b_rashi], lord[g_rashi]]
+    tables[5] = np.array(GANA_TABLE)[gana[b_nak], gana[g_nak]]
+    tables[6] = np.where(bhakoot_bad, 0, 7)
+    tables[7] = np.where(nadi[b_nak] == nadi[g_nak], 0, 8)
+    return tables
+
+KOOTA_TABLES = _build_koota_tables()
+KOOTA_TOTAL = KOOTA_TABLES.sum(axis=0)
+
+def moon_pada_index(moon_long):
+    return int(moon_long / 3.333333333) % PADA_COUNT
+
+def get_koota_details(boy_pada, girl_pada):
+    scores = KOOTA_TABLES[:, boy_pada, girl_pada]
+    return {
+        "boy": PADA_NAMES[boy_pada], "girl": PADA_NAMES[girl_pada],
+        "boy_rashi": RASHIS[boy_pada // 9], "girl_rashi": RASHIS[girl_pada // 9],
+        "kootas": [{"name": n, "score": float(s), "max": m} for n, s, m in zip(KOOTAS, scores, KOOTA_MAX)],
+        "total": float(scores.sum()), "max": sum(KOOTA_MAX)
+    }
+
+def match_horoscopes(boy_data, girl_data):
+    return get_koota_details(boy_data['moon_pada_idx'], girl_data['moon_pada_idx'])
+
+def score_candidates(pada_idx, candidate_padas, is_boy=True, kootas=False):
+    candidate_padas = np.asarray(candidate_padas, dtype=np.intp)
+    if kootas:
+        return KOOTA_TABLES[:, pada_idx, candidate_padas] if is_boy else KOOTA_TABLES[:, candidate_padas, pada_idx]
+    return KOOTA_TOTAL[pada_idx, candidate_padas] if is_boy else KOOTA_TOTAL[candidate_padas, pada_idx]
+
+def top_matches(pada_idx, candidate_padas, k=10, is_boy=True, min_score=0.0):
+    scores = score_candidates(pada_idx, candidate_padas, is_boy)
+    candidates = np.flatnonzero(scores >= min_score)
+    if len(candidates) > k:
+        part = np.argpartition(-scores[candidates], k - 1)[:k]
+        candidates = candidates[part]
+    # Stable ordering: highest score first, then original candidate order
+    order = np.lexsort((candidates, -scores[candidates]))
+    candidates = candidates[order]
+    return candidates, scores[candidates]
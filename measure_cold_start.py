@@ -0,0 +1,52 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# ================= COLD START MEASUREMENT =================
+# Each run is a fresh interpreter, like a newly scaled-up worker. It reports
+# how long importing the engine takes, how long warmup() takes and how long
+# the first fetch_panchang call takes with and without a prior warmup.
+#
+#   python measure_cold_start.py --runs 5
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import panchang_engine as pe
+t1 = time.perf_counter()
+if sys.argv[1] == "1": pe.warmup()
+t2 = time.perf_counter()
+import pytz
+from datetime import datetime
+loc = {"name": "Bengaluru", "lat": 12.9716, "lon": 77.5946, "tz": pytz.timezone("Asia/Kolkata")}
+pe.fetch_panchang(loc, datetime.now(loc["tz"]).strftime("%Y-%m-%d"))
+t3 = time.perf_counter()
+heavy = [m for m in ("geopy", "timezonefinder") if m in sys.modules]
+print(json.dumps({"import": t1 - t0, "warmup": t2 - t1, "first_request": t3 - t2, "ready": t2 - t0, "heavy_modules_loaded": heavy}))
+"""
+
+def run_probe(warm):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", PROBE, "1" if warm else "0"], cwd=here, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def summarize(samples):
+    return {k: round(statistics.median(s[k] for s in samples) * 1000, 1) for k in ("import", "warmup", "first_request", "ready")}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-worker cold start time of the panchang engine.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for mode, warm in (("cold", False), ("warmed", True)):
+        samples = [run_probe(warm) for _ in range(args.runs)]
+        report[mode] = {"median_ms": summarize(samples), "heavy_modules_loaded": samples[-1]['heavy_modules_loaded']}
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
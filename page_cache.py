@@ -0,0 +1,51 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# ================= RENDERED PAGE CACHE =================
+# Month, muhurtha and dated panchang pages are pure functions of their
+# normalized inputs, the engine configuration and the code. page_etag hashes
+# all three into a strong ETag, so a conditional request can be answered 304
+# before any geocoding or computation, and PageCache keeps the rendered HTML
+# under the same key so a repeat view skips both computation and Jinja.
+
+def _build_id(root):
+    # Source and templates: a deploy changes every ETag, even for identical inputs
+    h = hashlib.sha256()
+    for folder in (root, os.path.join(root, 'templates')):
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(('.py', '.html')):
+                with open(os.path.join(folder, name), 'rb') as f: h.update(name.encode() + f.read())
+    return h.hexdigest()[:16]
+
+BUILD_ID = _build_id(os.path.dirname(os.path.abspath(__file__)))
+
+def normalize_location(name):
+    return " ".join((name or "").lower().split())
+
+def page_etag(view, inputs, config=()):
+    parts = [BUILD_ID, view] + [f"{k}={inputs[k]}" for k in sorted(inputs)] + [str(c) for c in config]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32]
+
+class PageCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None: self._pages.move_to_end(key)
+            return page
+
+    def put(self, key, page):
+        if self.max_entries <= 0: return
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries: self._pages.popitem(last=False)
+
+    def __len__(self):
+        return len(self._pages)
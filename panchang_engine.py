@@ -1,12 +1,23 @@
 import swisseph as swe
 from datetime import datetime, timedelta, date
 import pytz
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
 import os
 import math
+import re
 import urllib.parse
 import calendar
+import functools
+import threading
+import time
+import numpy as np
+from varga import compute_vargas, varga_chart_data, VARGA_NAMES
+from dasha import iter_dasha, dasha_at
+from panchang_store import PanchangStore, STORE_DTYPE
+from ephemeris_series import EphemerisSeries, build_ephemeris_series
+from day_division import day_divisions, get_nakshatra_windows, HORA_LORDS, CHOGHADIYA_NAMES
+import rule_tables
+import intervals
+import eclipses
 
 # ================= CONFIG =================
 SERVER_EPHE_PATH = '/home/u285716465/domains/dwara.org/public_html/vedic/ephe'
@@ -15,7 +26,38 @@ if os.path.exists(SERVER_EPHE_PATH):
 else:
     EPHEMERIS_PATH = os.path.join(os.path.dirname(__file__), 'ephe')
 
-SIDEREAL_MODE = swe.SIDM_LAHIRI
+# Positions are computed and cached tropically; each request picks an
+# ayanamsa, applied as an offset interpolated from a per-mode table
+AYANAMSAS = {"lahiri": swe.SIDM_LAHIRI, "raman": swe.SIDM_RAMAN, "kp": swe.SIDM_KRISHNAMURTI, "yukteshwar": swe.SIDM_YUKTESHWAR}
+DEFAULT_AYANAMSA = os.environ.get('AYANAMSA', 'lahiri')
+
+# Position backend, chosen per deployment:
+#   swiss   - Swiss Ephemeris files under EPHEMERIS_PATH
+#   moshier - built-in Moshier theory, no file I/O, slower per call
+#   series  - Sun/Moon from Chebyshev series (see ephemeris_series.py),
+#             everything else from Moshier
+EPHEMERIS_MODES = {"swiss": swe.FLG_SWIEPH, "moshier": swe.FLG_MOSEPH, "series": swe.FLG_MOSEPH}
+EPHEMERIS_MODE = os.environ.get('EPHEMERIS_MODE', 'swiss')
+EPHE_FLAG = EPHEMERIS_MODES[EPHEMERIS_MODE]
+# Prebuilt series file for the series backend; without one, 20-year chunks are
+# fitted from the ephemeris files on first use
+EPHEMERIS_SERIES_PATH = os.environ.get('EPHEMERIS_SERIES_PATH')
+SERIES_CHUNK_YEARS = 20
+
+# Prebuilt eclipse index (see eclipses.py); without one, century chunks are
+# searched on first use
+ECLIPSE_INDEX_PATH = os.environ.get('ECLIPSE_INDEX_PATH')
+ECLIPSE_CHUNK_YEARS = 100
+# Requestable years: the .se1 files span about -13000 to +17000, but dates go through
+# datetime (years 1-9999) and a month view reaches a day into its neighbours
+SUPPORTED_YEARS = (2, 9998)
+
+# Precomputed daily store (see panchang_store.py); live computation when unset or on a miss
+PANCHANG_STORE_PATH = os.environ.get('PANCHANG_STORE_PATH')
+PANCHANG_STORE = PanchangStore(PANCHANG_STORE_PATH) if PANCHANG_STORE_PATH else None
+
+# Snap observer coordinates to this grid (degrees) for sunrise and lagna work; 0 disables
+LOCATION_GRID_DEG = float(os.environ.get('LOCATION_GRID_DEG', 0) or 0)
 
 # ================= DATA CONSTANTS =================
 MONTHS = ["Chaitra", "Vaishakha", "Jyeshtha", "Ashadha", "Shravana", "Bhadrapada", "Ashwina", "Kartika", "Margashirsha", "Pausha", "Magha", "Phalguna"]
@@ -39,9 +81,6 @@ TITHI_ICONS = {"Shukla Pratipada": "🌒", "Shukla Dwitiya": "🌒", "Shukla Tri
 
 VARJYAM_STARTS = [50, 24, 30, 40, 14, 21, 30, 20, 32, 30, 20, 18, 22, 20, 14, 14, 10, 14, 20, 24, 20, 10, 10, 18, 16, 24, 30]
 AMRIT_STARTS = [42, 48, 54, 52, 38, 35, 54, 44, 56, 54, 44, 48, 42, 46, 34, 32, 38, 38, 40, 48, 52, 38, 38, 42, 36, 48, 56]
-RAHU_KEY = {0: 2, 1: 7, 2: 5, 3: 6, 4: 4, 5: 3, 6: 8}
-YAMA_KEY = {0: 4, 1: 3, 2: 2, 3: 1, 4: 7, 5: 6, 6: 5}
-GULI_KEY = {0: 6, 1: 5, 2: 4, 3: 3, 4: 2, 5: 1, 6: 7}
 
 FESTIVAL_DB = {
     (0, 0, 0): "Ugadi / Gudi Padwa", (0, 0, 8): "Rama Navami", (0, 0, 14): "Hanuman Jayanti",
@@ -96,19 +135,93 @@ FESTIVAL_IMAGES_STATIC = {
 # ================= CORE FUNCTIONS =================
 def setup_swisseph():
     swe.set_ephe_path(EPHEMERIS_PATH)
-    swe.set_sid_mode(SIDEREAL_MODE)
+
+def set_ephemeris_mode(mode):
+    global EPHEMERIS_MODE, EPHE_FLAG
+    if mode not in EPHEMERIS_MODES: raise ValueError(f"Unknown ephemeris mode: {mode}")
+    EPHEMERIS_MODE, EPHE_FLAG = mode, EPHEMERIS_MODES[mode]
+    # Everything memoised on positions belongs to the previous backend
+    for cached in (tropical_longitude, _sun_rise_set_at, _lunar_calendar_chunk, _eclipse_chunk, _local_eclipse): cached.cache_clear()
+
+# geopy and timezonefinder are imported on first use: most requests pass a
+# ready location dict and never need them
+@functools.lru_cache(maxsize=None)
+def get_geocoder():
+    from geopy.geocoders import Nominatim
+    return Nominatim(user_agent="dwara_panchang_v9", timeout=5)
+
+@functools.lru_cache(maxsize=None)
+def get_timezone_finder():
+    from timezonefinder import TimezoneFinder
+    return TimezoneFinder()
+
+@functools.lru_cache(maxsize=None)
+def get_city_index():
+    from reverse_geocode import CityIndex
+    return CityIndex.from_file()
+
+# --- COORDINATE INPUT ---
+# "12.9716, 77.5946" (or "12.9716 77.5946") is taken as latitude, longitude and
+# named offline after the nearest city, so GPS input never reaches Nominatim.
+# Beyond NEAREST_PLACE_KM the name says "near" rather than claiming the city,
+# and beyond NEAR_PLACE_KM (mid-ocean, say) it is only the coordinates.
+COORDINATE_RE = re.compile(r'^\s*([-+]?\d+(?:\.\d+)?)\s*[,\s]\s*([-+]?\d+(?:\.\d+)?)\s*$')
+NEAREST_PLACE_KM = 25.0
+NEAR_PLACE_KM = 300.0
+
+def parse_coordinates(text):
+    m = COORDINATE_RE.match(text or "")
+    if not m: return None
+    lat, lon = float(m.group(1)), float(m.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180): return None
+    return lat, lon
+
+def location_from_coordinates(lat, lon):
+    place = get_city_index().nearest(lat, lon)
+    tz_str = get_timezone_finder().timezone_at(lng=lon, lat=lat)
+    # Open sea or ice with no zone: whole hours from the longitude (Etc/GMT signs are inverted)
+    if tz_str is None: tz_str = f"Etc/GMT{-round(lon / 15):+d}" if round(lon / 15) else "UTC"
+    coords = f"{abs(lat):.4f}°{'N' if lat >= 0 else 'S'} {abs(lon):.4f}°{'E' if lon >= 0 else 'W'}"
+    if place is None or place['distance_km'] > NEAR_PLACE_KM: name = coords
+    elif place['distance_km'] <= NEAREST_PLACE_KM: name = place['name']
+    else: name = f"{coords} (near {place['name']})"
+    return {'name': name, 'lat': lat, 'lon': lon, 'tz': pytz.timezone(tz_str)}
+
+# Stands in for the geocoder when set: name -> location dict or None (see load_test.py)
+LOCATION_RESOLVER = None
+
+def set_location_resolver(resolver):
+    global LOCATION_RESOLVER
+    LOCATION_RESOLVER = resolver
 
 def get_location(name):
+    coords = parse_coordinates(name)
+    if coords: return location_from_coordinates(*coords)
+    if LOCATION_RESOLVER is not None: return LOCATION_RESOLVER(name)
     try:
-        geolocator = Nominatim(user_agent="dwara_panchang_v9", timeout=5)
-        loc = geolocator.geocode(name)
+        loc = get_geocoder().geocode(name)
         if not loc: return None
-        tf = TimezoneFinder()
-        tz_str = tf.timezone_at(lng=loc.longitude, lat=loc.latitude)
+        tz_str = get_timezone_finder().timezone_at(lng=loc.longitude, lat=loc.latitude)
         return {'name': loc.address, 'lat': loc.latitude, 'lon': loc.longitude, 'tz': pytz.timezone(tz_str)}
     except Exception:
         return None
 
+def warmup(lat=12.9716, lon=77.5946, geocoder=False, timezone_finder=False, city_index=False):
+    # Pay one-off costs before the first request: open the .se1 segments for the
+    # current epoch, build the lunar index chunk and optionally the lazy singletons
+    setup_swisseph()
+    now_jd = jd_from_dt(datetime.now(pytz.utc))
+    for jd in (now_jd - 400, now_jd, now_jd + 400):
+        for g in range(len(GRAHAS)): graha_longitude(jd, g)
+        swe.houses(jd, lat, lon, b'P')
+    calc_sun_rise_set(now_jd, lat, lon)
+    calc_moon_rise_set(now_jd, lat, lon)
+    get_lunar_month_details(now_jd)
+    get_eclipse_index(now_jd, now_jd)
+    if geocoder: get_geocoder()
+    if timezone_finder: get_timezone_finder()
+    if city_index: get_city_index()
+
 def jd_from_dt(dt_local):
     dt_utc = dt_local.astimezone(pytz.utc)
     return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, dt_utc.hour + dt_utc.minute/60.0 + dt_utc.second/3600.0)
@@ -125,33 +238,114 @@ def dt_from_jd(jd, tz):
     except: return None
 
 # ================= CALCULATORS =================
+# --- LOCATION GRID ---
+# Observer-dependent results are computed once per grid cell and moved to the
+# exact longitude with a first-order shift (4 minutes of time per degree).
+# The latitude offset is left uncorrected; max_quantization_error_minutes bounds it.
+def quantize_location(lat, lon, grid_deg=None):
+    g = LOCATION_GRID_DEG if grid_deg is None else grid_deg
+    if not g: return lat, lon
+    return round(round(lat / g) * g, 6), round(round(lon / g) * g, 6)
+
+def max_quantization_error_minutes(lat, grid_deg=None):
+    g = LOCATION_GRID_DEG if grid_deg is None else grid_deg
+    if not g: return 0.0
+    # Rising of any ecliptic point (Sun or lagna boundary) has |declination| <= obliquity
+    h0 = math.radians(-0.833)
+    def hour_angle(phi, dec):
+        c = (math.sin(h0) - math.sin(phi) * math.sin(dec)) / (math.cos(phi) * math.cos(dec))
+        if abs(c) > 1: return None
+        return math.degrees(math.acos(c))
+    worst = 0.0
+    for dec_deg in np.linspace(-23.44, 23.44, 48):
+        dec = math.radians(dec_deg)
+        base = hour_angle(math.radians(lat), dec)
+        for d in (-g / 2, g / 2):
+            other = hour_angle(math.radians(lat + d), dec)
+            if base is None or other is None: return float('inf')
+            worst = max(worst, abs(other - base) * 4.0)
+    return worst
+
+# --- SUNRISE ---
+# Only above about 65.5 degrees can the Sun stay up (polar day) or down
+# (polar night) for a whole day. There the day is classified from the Sun's
+# declination first, so the rise/set search is skipped when it cannot succeed,
+# and such a day takes sunrise at 06:00 and sunset at 18:00 local mean solar
+# time, which gives every day division an equal day and night to split.
+SUN_STATES = ("normal", "polar_day", "polar_night")
+SUN_RISE_ALT = -0.5667  # rise_trans uses the disc centre with refraction
+SUN_POLAR_LAT = 90 - 23.45 - 1.0
+POLAR_RISE_HOUR, POLAR_SET_HOUR = 6.0, 18.0
+SUN_STATE_NOTES = {
+    "polar_day": "Polar day: the Sun does not set. Sunrise and sunset are taken as 6 AM and 6 PM local mean time.",
+    "polar_night": "Polar night: the Sun does not rise. Sunrise and sunset are taken as 6 AM and 6 PM local mean time.",
+}
+
+def classify_sun_day(jd, lat):
+    # -> "normal" when a rise and set are possible, else the polar state (borderline days count as normal)
+    if abs(lat) < SUN_POLAR_LAT: return "normal"
+    dec = swe.calc_ut(jd, swe.SUN, EPHE_FLAG | swe.FLG_EQUATORIAL)[0][1]
+    phi, h0 = math.radians(lat), math.radians(SUN_RISE_ALT)
+    # The search window spans about a day, over which the declination moves up to 0.4 degrees
+    c = [(math.sin(h0) - math.sin(phi) * math.sin(math.radians(d))) / (math.cos(phi) * math.cos(math.radians(d))) for d in (dec - 0.5, dec + 0.5)]
+    if min(c) > 1: return "polar_night"
+    if max(c) < -1: return "polar_day"
+    return "normal"
+
+def polar_rise_set(jd, lon):
+    # Conventional sunrise/sunset for the local mean solar day containing jd
+    shift = lon / 360.0
+    midnight = math.floor(jd + 0.5 + shift) - 0.5 - shift
+    return midnight + POLAR_RISE_HOUR / 24, midnight + POLAR_SET_HOUR / 24
+
+@functools.lru_cache(maxsize=65536)
+def _sun_rise_set_at(jd, lat, lon):
+    state = classify_sun_day(jd, lat)
+    if state == "normal":
+        geopos = (float(lon), float(lat), 0.0)
+        try:
+            # From local midnight, so an early summer sunrise is not skipped for the next day's; the set follows the rise
+            res_rise, (rise, *_) = swe.rise_trans(jd - 0.5, swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos, 0.0, 0.0, EPHE_FLAG)
+            if res_rise == 0 and rise < jd + 0.5:
+                res_set, (set_, *_) = swe.rise_trans(rise, swe.SUN, swe.CALC_SET | swe.BIT_DISC_CENTER, geopos, 0.0, 0.0, EPHE_FLAG)
+                if res_set == 0 and set_ - rise < 1: return rise, set_, state
+        except swe.Error: pass
+        # A borderline day the search could not resolve: the Sun is up or down by its noon altitude
+        noon_alt = swe.azalt(jd, swe.ECL2HOR, geopos, 0.0, 0.0, swe.calc_ut(jd, swe.SUN, EPHE_FLAG)[0][:3])[1]
+        state = "polar_day" if noon_alt > SUN_RISE_ALT else "polar_night"
+    return (*polar_rise_set(jd, lon), state)
+
+def calc_sun_day(jd, lat, lon):
+    # -> (rise, set, state); state is one of SUN_STATES, rise/set follow the polar convention when not "normal"
+    if jd is None: return 0.0, 0.0, "normal"
+    q_lat, q_lon = quantize_location(lat, lon)
+    rise, set_, state = _sun_rise_set_at(round(jd, 6), q_lat, q_lon)
+    if (q_lat, q_lon) == (lat, lon): return rise, set_, state
+    shift = (q_lon - lon) / 360.0
+    return rise + shift, set_ + shift, state
+
 def calc_sun_rise_set(jd, lat, lon):
-    if jd is None: return 0.0, 0.0
-    geopos = (float(lon), float(lat), 0.0)
-    jd_search = jd - 0.375
-    try:
-        rise = swe.rise_trans(jd_search, swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos)[1][0]
-        set_ = swe.rise_trans(jd_search, swe.SUN, swe.CALC_SET | swe.BIT_DISC_CENTER, geopos)[1][0]
-        return rise, set_
-    except: return 0.0, 0.0
+    return calc_sun_day(jd, lat, lon)[:2]
+
+def sun_day_state(jd, lat, lon):
+    # Cheap for the latitudes where every day is normal
+    if abs(lat) < SUN_POLAR_LAT: return "normal"
+    return calc_sun_day(jd, lat, lon)[2]
 
 def calc_moon_rise_set(jd_start, lat, lon):
     if jd_start is None: return 0.0, 0.0
     geopos = (float(lon), float(lat), 0.0)
     jd_search = jd_start - 0.5
     try:
-        res_rise = swe.rise_trans(jd_search, swe.MOON, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos)
-        res_set = swe.rise_trans(jd_search, swe.MOON, swe.CALC_SET | swe.BIT_DISC_CENTER, geopos)
+        res_rise = swe.rise_trans(jd_search, swe.MOON, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos, 0.0, 0.0, EPHE_FLAG)
+        res_set = swe.rise_trans(jd_search, swe.MOON, swe.CALC_SET | swe.BIT_DISC_CENTER, geopos, 0.0, 0.0, EPHE_FLAG)
         return res_rise[1][0], res_set[1][0]
     except: return 0.0, 0.0
 
-def get_pos(jd):
+def get_pos(jd, ayanamsa=None):
     if jd is None: return 0.0, 0.0
-    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | swe.FLG_SPEED
     try:
-        sun = swe.calc_ut(jd, swe.SUN, flags)[0][0]
-        moon = swe.calc_ut(jd, swe.MOON, flags)[0][0]
-        return sun, moon
+        return graha_longitude(jd, 0, ayanamsa), graha_longitude(jd, 1, ayanamsa)
     except: return 0.0, 0.0
 
 def get_events(start_jd, end_jd, func, names, count, is_karana=False):
@@ -209,88 +403,352 @@ def fmt_duration(jd_start, jd_end):
     seconds = total_seconds % 60
     return f"{hours:02d} Hours {minutes:02d} Mins {seconds:02d} Secs"
 
+# ================= SERIES BACKEND =================
+SERIES_NAMES = ["sun", "moon"]
+
+@functools.lru_cache(maxsize=None)
+def _series_file():
+    if not (EPHEMERIS_SERIES_PATH and os.path.exists(EPHEMERIS_SERIES_PATH)): return None
+    return EphemerisSeries.load(EPHEMERIS_SERIES_PATH)
+
+@functools.lru_cache(maxsize=8)
+def _series_chunk(chunk):
+    y = chunk * SERIES_CHUNK_YEARS
+    swe.set_ephe_path(EPHEMERIS_PATH)
+    return build_ephemeris_series(swe.julday(y, 1, 1, 0), swe.julday(y + SERIES_CHUNK_YEARS, 1, 1, 0))
+
+def get_ephemeris_series(jd):
+    series = _series_file()
+    if series is not None and series.covers(jd): return series
+    return _series_chunk(int(swe.revjul(jd)[0] // SERIES_CHUNK_YEARS))
+
+# ================= ECLIPSE INDEX =================
+@functools.lru_cache(maxsize=None)
+def _eclipse_index_file():
+    if not (ECLIPSE_INDEX_PATH and os.path.exists(ECLIPSE_INDEX_PATH)): return None
+    return eclipses.load_eclipse_index(ECLIPSE_INDEX_PATH)
+
+@functools.lru_cache(maxsize=8)
+def _eclipse_chunk(chunk):
+    y = chunk * ECLIPSE_CHUNK_YEARS
+    swe.set_ephe_path(EPHEMERIS_PATH)
+    return eclipses.build_eclipse_index(swe.julday(y, 1, 1, 0), swe.julday(y + ECLIPSE_CHUNK_YEARS, 1, 1, 0), EPHE_FLAG)
+
+def get_eclipse_index(start_jd, end_jd):
+    # Rows with maxima a day either side of the range are included, as candidate_rows expects
+    start_jd, end_jd = start_jd - 1, end_jd + 2
+    indexed = _eclipse_index_file()
+    if indexed is not None and indexed[1] <= start_jd and end_jd < indexed[2]: return indexed[0]
+    first, last = (int(swe.revjul(jd)[0] // ECLIPSE_CHUNK_YEARS) for jd in (start_jd, end_jd))
+    if first == last: return _eclipse_chunk(first)
+    return np.concatenate([_eclipse_chunk(c) for c in range(first, last + 1)])
+
+@functools.lru_cache(maxsize=1024)
+def _local_eclipse(body, jd_begin, jd_max, lat, lon):
+    return eclipses.local_circumstances(body, jd_begin, jd_max, lat, lon, EPHE_FLAG)
+
+def get_eclipses(lat, lon, start_jd, end_jd):
+    # Eclipses visible from (lat, lon) whose contacts or sutak overlap the range;
+    # only the index candidates get a local search
+    setup_swisseph()
+    index = get_eclipse_index(start_jd, end_jd)
+    found = []
+    for row in eclipses.candidate_rows(index, start_jd, end_jd, max(eclipses.SUTAK_HOURS.values()) / 24.0):
+        local = _local_eclipse(int(index['body'][row]), float(index['jd_begin'][row]), float(index['jd_max'][row]), round(lat, 4), round(lon, 4))
+        if local is None or local['end'] < start_jd or (local['sutak_start'] or local['begin']) > end_jd: continue
+        found.append(dict(local))
+    return found
+
+# ================= AYANAMSA OFFSETS =================
+# Sidereal longitude = tropical longitude (mean equinox) - mean ayanamsa. The
+# mean ayanamsa is a slow precession curve, so each mode is sampled once per
+# century chunk and linearly interpolated (error < 1e-6"). Sampling is the only
+# place that touches swe.set_sid_mode, under a lock.
+AYANAMSA_STEP = 16.0
+AYANAMSA_CHUNK_DAYS = 36525.0
+_ayanamsa_lock = threading.Lock()
+
+def resolve_ayanamsa(ayanamsa=None):
+    name = (ayanamsa or DEFAULT_AYANAMSA).lower()
+    if name not in AYANAMSAS: raise ValueError(f"Unknown ayanamsa: {ayanamsa}")
+    return name
+
+@functools.lru_cache(maxsize=64)
+def _ayanamsa_table(name, chunk):
+    start = chunk * AYANAMSA_CHUNK_DAYS
+    jds = start + np.arange(int(AYANAMSA_CHUNK_DAYS / AYANAMSA_STEP) + 2) * AYANAMSA_STEP
+    with _ayanamsa_lock:
+        swe.set_sid_mode(AYANAMSAS[name])
+        return start, [swe.get_ayanamsa_ut(float(jd)) for jd in jds]
+
+def ayanamsa_offset(jd, ayanamsa=None):
+    start, values = _ayanamsa_table(resolve_ayanamsa(ayanamsa), int(jd // AYANAMSA_CHUNK_DAYS))
+    pos = (jd - start) / AYANAMSA_STEP
+    i = int(pos)
+    return values[i] + (pos - i) * (values[i + 1] - values[i])
+
+def nutation_longitude(jd):
+    # Ascendants are referred to the true equinox; positions here to the mean one
+    return swe.calc_ut(jd, swe.ECL_NUT)[0][2]
+
+# ================= TRANSIT (GOCHARA) INDEX =================
+GRAHAS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+GRAHA_BODIES = [swe.SUN, swe.MOON, swe.MARS, swe.MERCURY, swe.JUPITER, swe.VENUS, swe.SATURN, swe.MEAN_NODE, swe.MEAN_NODE]
+GRAHA_OFFSETS = [0, 0, 0, 0, 0, 0, 0, 0, 180]
+# Sampling step (days) per graha: small enough that no graha crosses two
+# boundaries, or crosses and re-crosses one at a station, between samples
+INGRESS_STEPS = [1.0, 0.25, 1.0, 0.5, 2.0, 1.0, 2.0, 2.0, 2.0]
+INGRESS_KINDS = ["sign", "nakshatra"]
+INGRESS_SPANS = [30.0, 360.0 / 27]
+INGRESS_DTYPE = np.dtype([('jd', 'f8'), ('graha', 'i1'), ('kind', 'i1'), ('index', 'i1'), ('retro', '?')])
+
+@functools.lru_cache(maxsize=65536)
+def tropical_longitude(jd, graha_idx):
+    # Shared by every ayanamsa
+    if graha_idx < 2 and EPHEMERIS_MODE == "series":
+        return get_ephemeris_series(jd).tropical_longitude(jd, SERIES_NAMES[graha_idx])
+    flags = EPHE_FLAG | swe.FLG_NONUT
+    return (swe.calc_ut(jd, GRAHA_BODIES[graha_idx], flags)[0][0] + GRAHA_OFFSETS[graha_idx]) % 360
+
+def graha_longitude(jd, graha_idx, ayanamsa=None):
+    return (tropical_longitude(jd, graha_idx) - ayanamsa_offset(jd, ayanamsa)) % 360
+
+def find_crossing(func, boundary, t1, t2):
+    # Instant in (t1, t2] where the longitude func(t) crosses boundary, by
+    # bracketed false position (Illinois variant) down to find_trans' tolerance
+    diff = lambda t: (func(t) - boundary + 180) % 360 - 180
+    f1, f2 = diff(t1), diff(t2)
+    side = 0
+    for _ in range(60):
+        if (t2 - t1) <= 0.00001 or f1 == f2: break
+        mid = t2 - f2 * (t2 - t1) / (f2 - f1)
+        fm = diff(mid)
+        if abs(fm) < 1e-7: return mid
+        if (fm < 0) == (f2 < 0):
+            t2, f2 = mid, fm
+            if side == -1: f1 /= 2
+            side = -1
+        else:
+            t1, f1 = mid, fm
+            if side == 1: f2 /= 2
+            side = 1
+    return t2
+
+def find_ingresses(graha_idx, start_jd, end_jd, ayanamsa=None):
+    func = lambda t: graha_longitude(t, graha_idx, ayanamsa)
+    times = np.arange(start_jd, end_jd + INGRESS_STEPS[graha_idx], INGRESS_STEPS[graha_idx])
+    longs = np.array([func(t) for t in times])
+    motion = (np.diff(longs) + 180) % 360 - 180
+    rows = []
+    for kind, span in enumerate(INGRESS_SPANS):
+        div = (longs // span).astype(int)
+        for i in np.flatnonzero(div[:-1] != div[1:]):
+            retro = motion[i] < 0
+            boundary = (div[i] if retro else div[i + 1]) * span
+            jd = find_crossing(func, boundary, times[i], times[i + 1])
+            if start_jd <= jd < end_jd: rows.append((jd, graha_idx, kind, div[i + 1], retro))
+    return rows
+
+class IngressIndex:
+    def __init__(self, records, start_jd, end_jd):
+        self.records = np.sort(np.asarray(records, dtype=INGRESS_DTYPE), order='jd')
+        self.start_jd, self.end_jd = start_jd, end_jd
+
+    def between(self, jd_a, jd_b, grahas=None, kind=None):
+        lo, hi = np.searchsorted(self.records['jd'], [jd_a, jd_b])
+        res = self.records[lo:hi]
+        if grahas is not None: res = res[np.isin(res['graha'], [GRAHAS.index(g) if isinstance(g, str) else g for g in grahas])]
+        if kind is not None: res = res[res['kind'] == INGRESS_KINDS.index(kind)]
+        return res
+
+    def events(self, jd_a, jd_b, grahas=None, kind=None):
+        names = (RASHIS, NAKSHATRAS)
+        return [{"graha": GRAHAS[r['graha']], "kind": INGRESS_KINDS[r['kind']], "index": int(r['index']), "name": names[r['kind']][r['index']], "jd": float(r['jd']), "retro": bool(r['retro'])} for r in self.between(jd_a, jd_b, grahas, kind)]
+
+    def save(self, path):
+        np.savez_compressed(path, records=self.records, span=np.array([self.start_jd, self.end_jd]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f['records'], *f['span'])
+
+def build_ingress_index(start_jd, end_jd, grahas=range(len(GRAHAS)), ayanamsa=None):
+    setup_swisseph()
+    records = []
+    for g in grahas: records.extend(find_ingresses(g, start_jd, end_jd, ayanamsa))
+    return IngressIndex(records, start_jd, end_jd)
+
+# ================= LUNAR CALENDAR INDEX =================
+# Every amavasya, purnima and solar sankranti in a range, so the amanta month,
+# paksha and adhika/kshaya status of any instant is a binary search.
+SYNODIC_MONTH = 29.530588861
+NEW_MOON_EPOCH = 2451550.09766  # 2000-01-06 14:20 UT
+LUNAR_CHUNK_YEARS = 20
+
+def elongation(jd):
+    # The ayanamsa cancels, so tithis and karanas are the same in every mode
+    return (tropical_longitude(jd, 1) - tropical_longitude(jd, 0)) % 360
+
+def find_lunar_phases(start_jd, end_jd, target):
+    # Mean lunations only seed the solver; true phases lie within ~0.6 days
+    k = math.floor((start_jd - NEW_MOON_EPOCH) / SYNODIC_MONTH) - 1
+    phases = []
+    while True:
+        guess = NEW_MOON_EPOCH + (k + target / 360.0) * SYNODIC_MONTH
+        if guess - 1.5 > end_jd: break
+        jd = find_crossing(elongation, target, guess - 1.5, guess + 1.5)
+        if start_jd <= jd < end_jd: phases.append(jd)
+        k += 1
+    return np.array(phases)
+
+class LunarCalendarIndex:
+    def __init__(self, new_moons, full_moons, sankrantis, sankranti_signs):
+        self.new_moons = np.asarray(new_moons, dtype=np.float64)
+        self.full_moons = np.asarray(full_moons, dtype=np.float64)
+        self.sankrantis = np.asarray(sankrantis, dtype=np.float64)
+        self.sankranti_signs = np.asarray(sankranti_signs, dtype=np.int8)
+
+    def covers(self, jd):
+        return len(self.new_moons) > 1 and self.new_moons[0] <= jd < self.new_moons[-1] and len(self.sankrantis) and self.sankrantis[0] <= self.new_moons[0]
+
+    def month_details(self, jd):
+        i = np.searchsorted(self.new_moons, jd, side='right') - 1
+        start, end = self.new_moons[i], self.new_moons[i + 1]
+        s_lo, s_hi = np.searchsorted(self.sankrantis, [start, end])
+        sun_sign = int(self.sankranti_signs[s_lo - 1])
+        n_sankranti = s_hi - s_lo
+        full_moon = self.full_moons[np.searchsorted(self.full_moons, start)]
+        month_idx = (sun_sign + 1) % 12
+        return {
+            "month_idx": month_idx, "name": MONTHS[month_idx],
+            "paksha": 0 if jd < full_moon else 1,
+            "is_adhika": bool(n_sankranti == 0), "is_kshaya": bool(n_sankranti > 1),
+            "kshaya_month": MONTHS[(sun_sign + 2) % 12] if n_sankranti > 1 else None,
+            "new_moon": float(start), "full_moon": float(full_moon), "next_new_moon": float(end)
+        }
+
+    def save(self, path):
+        np.savez_compressed(path, new_moons=self.new_moons, full_moons=self.full_moons, sankrantis=self.sankrantis, sankranti_signs=self.sankranti_signs)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f['new_moons'], f['full_moons'], f['sankrantis'], f['sankranti_signs'])
+
+def build_lunar_calendar(start_jd, end_jd, ayanamsa=None):
+    setup_swisseph()
+    # Margins make sure the first/last lunation and the sankranti before it are present
+    sank = [r for r in find_ingresses(0, start_jd - 70, end_jd + 40, ayanamsa) if r[2] == 0]
+    return LunarCalendarIndex(
+        find_lunar_phases(start_jd - 35, end_jd + 35, 0.0), find_lunar_phases(start_jd - 35, end_jd + 35, 180.0),
+        [r[0] for r in sank], [r[3] for r in sank]
+    )
+
+@functools.lru_cache(maxsize=16)
+def _lunar_calendar_chunk(chunk, ayanamsa):
+    y = chunk * LUNAR_CHUNK_YEARS
+    return build_lunar_calendar(swe.julday(y, 1, 1, 0), swe.julday(y + LUNAR_CHUNK_YEARS, 1, 1, 0), ayanamsa)
+
+LUNAR_CALENDAR = None  # optional long-range LunarCalendarIndex for DEFAULT_AYANAMSA, loaded by the deployment
+
+def get_lunar_month_details(jd, ayanamsa=None):
+    ayanamsa = resolve_ayanamsa(ayanamsa)
+    if LUNAR_CALENDAR is not None and ayanamsa == DEFAULT_AYANAMSA and LUNAR_CALENDAR.covers(jd): return LUNAR_CALENDAR.month_details(jd)
+    year = swe.revjul(jd)[0]
+    return _lunar_calendar_chunk(year // LUNAR_CHUNK_YEARS, ayanamsa).month_details(jd)
+
+# ================= TRANSITION TABLES =================
+# Tithi/nakshatra/yoga/karana boundaries over an arbitrary span. Each quantity
+# grows monotonically, so every boundary is bracketed from the previous one
+# using a lower bound on its daily motion.
+TRANSITION_KINDS = {
+    "tithi": (lambda jd, ayanamsa: elongation(jd), 12.0, 30, 12.19),
+    "nakshatra": (lambda jd, ayanamsa: graha_longitude(jd, 1, ayanamsa), 360.0 / 27, 27, 13.18),
+    "yoga": (lambda jd, ayanamsa: (graha_longitude(jd, 0, ayanamsa) + graha_longitude(jd, 1, ayanamsa)) % 360, 360.0 / 27, 27, 14.17),
+    "karana": (lambda jd, ayanamsa: elongation(jd), 6.0, 60, 12.19),
+}
+
+def get_transition_table(kind, start_jd, end_jd, ayanamsa=None):
+    setup_swisseph()
+    kind_func, span, count, rate = TRANSITION_KINDS[kind]
+    func = lambda jd: kind_func(jd, ayanamsa)
+    max_gap = span / (0.8 * rate)
+    idx = int(func(start_jd) // span)
+    starts = [find_crossing(func, idx * span, start_jd - max_gap, start_jd)]
+    indices = [idx]
+    while starts[-1] < end_jd:
+        idx = (idx + 1) % count
+        starts.append(find_crossing(func, idx * span, starts[-1], starts[-1] + max_gap))
+        indices.append(idx)
+    starts = np.array(starts)
+    return {"start": starts[:-1], "end": starts[1:], "index": np.array(indices[:-1], dtype=np.int16)}
+
+def lookup_transitions(table, jds):
+    return np.searchsorted(table['end'], jds, side='right')
+
 # ================= HELPER CALCULATORS =================
+# Rule helpers gather from rule_tables; indices may be scalars or arrays
 def get_tamil_yoga(weekday_idx, nak_idx):
-    marana_combos = [(6, 1), (0, 13), (1, 20), (2, 18), (3, 9), (4, 10), (5, 26)]
-    amrita_combos = [(6, 12), (0, 21), (1, 6), (2, 23), (3, 7), (4, 26), (5, 3)]
-    key = (weekday_idx, nak_idx)
-    if key in marana_combos: return "Marana"
-    if key in amrita_combos: return "Amrita"
-    return "Siddha"
+    return rule_tables.tamil_yoga(weekday_idx, nak_idx)
 
 def get_sarvartha_siddhi(weekday_idx, nak_idx):
-    ss_map = {6: [12, 7, 18, 11, 20, 25, 0], 0: [21, 3, 4, 7, 16], 1: [0, 2, 4, 8], 2: [3, 16, 12, 2, 4], 3: [7, 16, 2, 6, 26], 4: [26, 16, 0, 6, 21], 5: [3, 14, 21]}
-    return nak_idx in ss_map.get(weekday_idx, [])
+    return rule_tables.sarvartha_siddhi(weekday_idx, nak_idx)
 
 def get_vidaal_yoga(weekday_idx, nak_idx):
-    bad_map = {6: [1, 13], 0: [13], 1: [20], 2: [18], 3: [9], 4: [10], 5: [26]}
-    return nak_idx in bad_map.get(weekday_idx, [])
+    return rule_tables.vidaal_yoga(weekday_idx, nak_idx)
+
+def tripushkara_intervals(tithis, naks, days):
+    # Bhadra tithi and dual-footed nakshatra overlapping a Sunday/Tuesday/Saturday; "right" is the day row
+    pieces = intervals.intersect(intervals.intersect(intervals.select(tithis, rule_tables.TRIPUSHKARA_TITHIS), intervals.select(naks, rule_tables.TRIPUSHKARA_NAKS)), days)
+    return intervals.where(pieces, np.isin(days['index'][pieces['right']], rule_tables.TRIPUSHKARA_WEEKDAYS))
 
 def get_tripushkara_yoga(tithi_events, nak_events, weekday_idx, start_jd, end_jd, tz):
-    if weekday_idx not in [1, 5, 6]: return "None"
-    valid_tithis = [1, 6, 11, 16, 21, 26]
-    valid_naks = [2, 6, 11, 15, 20, 24]
-    timings = []
-    for t in tithi_events:
-        if t['index'] in valid_tithis:
-            t_s = max(t['start'], start_jd)
-            t_e = min(t['end'] if t['end'] else end_jd, end_jd)
-            for n in nak_events:
-                if n['index'] in valid_naks:
-                    n_s = max(n['start'], start_jd)
-                    n_e = min(n['end'] if n['end'] else end_jd, end_jd)
-                    latest_start = max(t_s, n_s)
-                    earliest_end = min(t_e, n_e)
-                    if latest_start < earliest_end:
-                        s_str = dt_from_jd(latest_start, tz).strftime('%I:%M %p')
-                        e_str = dt_from_jd(earliest_end, tz).strftime('%I:%M %p')
-                        timings.append(f"{s_str} - {e_str}")
+    day = intervals.make([start_jd], [end_jd], [weekday_idx])
+    found = tripushkara_intervals(intervals.from_events(tithi_events, end_jd), intervals.from_events(nak_events, end_jd), day)
+    timings = [f"{dt_from_jd(s, tz).strftime('%I:%M %p')} - {dt_from_jd(e, tz).strftime('%I:%M %p')}" for s, e in zip(found['start'], found['end'])]
     return ", ".join(timings) if timings else "None"
 
+def get_tripushkara_windows(loc, start_date, end_date, ayanamsa=None):
+    # Tripushkara over a date range from the transition tables in one sweep
+    setup_swisseph()
+    tz = loc['tz']
+    n_days = (end_date - start_date).days + 1
+    rises = np.empty(n_days + 1)
+    for i in range(n_days + 1):
+        d = start_date + timedelta(days=i)
+        rises[i] = calc_sun_rise_set(jd_from_dt(tz.localize(datetime(d.year, d.month, d.day, 12, 0))), loc['lat'], loc['lon'])[0]
+    first = jd_from_dt(tz.localize(datetime(start_date.year, start_date.month, start_date.day)))
+    tithis = get_transition_table("tithi", first - 1, first + n_days + 2)
+    naks = get_transition_table("nakshatra", first - 1, first + n_days + 2, ayanamsa)
+    days = intervals.days(rises, [(start_date + timedelta(days=i)).weekday() for i in range(n_days)])
+    found = tripushkara_intervals(tithis, naks, days)
+    t_rows = lookup_transitions(tithis, found['start'])
+    n_rows = lookup_transitions(naks, found['start'])
+    return [{"date": start_date + timedelta(days=int(d)), "tithi": TITHIS[tithis['index'][t]], "nakshatra": NAKSHATRAS[naks['index'][n]], "start": float(s), "end": float(e)}
+            for d, t, n, s, e in zip(found['right'], t_rows, n_rows, found['start'], found['end'])]
+
 def get_netram_jeevan(nak_idx):
-    n = nak_idx + 1
-    rem = n % 9
-    netram = 0
-    if rem in [3, 4, 5, 6]: netram = 1
-    elif rem in [7, 8, 0]: netram = 2
-    jeevan = 1 if netram > 0 else 0 
-    net_str = ["Zero Eyes", "One Eye", "Two Eyes"][netram]
-    jee_str = "Full Life" if jeevan else "Empty Life"
-    return net_str, jee_str
+    return rule_tables.netram_jeevan(nak_idx)
 
 def get_baana_type(sun_nak_idx, nak_idx):
-    dist = (nak_idx - sun_nak_idx) % 9
-    baana_map = {0: "Sthira (Good)", 1: "Roga (Bad)", 2: "Agni (Bad)", 3: "Raja (Good)", 4: "Chora (Bad)", 5: "Mrityu (Bad)", 6: "Sthira (Good)", 7: "Sthira (Good)", 8: "Sthira (Good)"}
-    return baana_map.get(dist, "Sthira")
+    return rule_tables.baana_type(sun_nak_idx, nak_idx)
 
 def get_calculated_timings(nak_events, weekday_idx, sun_nak_idx, tithi_events, start_jd, end_jd, tz):
-    ANANDADI_YOGAS = ["Ananda", "Kaladanda", "Dhumra", "Prajapati", "Soumya", "Dhwalka", "Dhwaja", "Srivatsa", "Vajra", "Mudgara", "Chhatra", "Mitra", "Manasa", "Padma", "Lumba", "Utpata", "Mrityu", "Kana", "Siddhi", "Shubha", "Amrita", "Musala", "Gada", "Matanga", "Rakshasa", "Chara", "Sthira", "Pravardhamana"]
-    ananda_offset = {6:0, 0:22, 1:18, 2:14, 3:10, 4:6, 5:2}
-    def fmt_event(ev_list, type_fn):
-        res = []
-        for e in ev_list:
-            val = type_fn(e['index'])
-            d_end = dt_from_jd(e['end'], tz)
-            end_t = d_end.strftime('%b %d, %I:%M %p') if d_end and e['end'] else "Full Night"
-            res.append(f"{val} upto {end_t}")
-        return " | ".join(res)
-    anandadi_str = fmt_event(nak_events, lambda idx: ANANDADI_YOGAS[(idx + ananda_offset[weekday_idx]) % 28])
-    tamil_str = fmt_event(nak_events, lambda idx: get_tamil_yoga(weekday_idx, idx))
-    baana_str = fmt_event(nak_events, lambda idx: get_baana_type(sun_nak_idx, idx))
-    n, j = get_netram_jeevan(nak_events[0]['index'])
-    ss_found = []
-    vidaal_found = []
+    rules = rule_tables.nakshatra_rules(weekday_idx, [e['index'] for e in nak_events], sun_nak_idx)
+    ends, spans = [], []
     for e in nak_events:
-        d_start = dt_from_jd(e['start'], tz)
-        start_t = d_start.strftime('%I:%M %p') if d_start else "..."
-        d_end = dt_from_jd(e['end'], tz)
-        end_t = d_end.strftime('%I:%M %p') if d_end and e['end'] else "Full Night"
-        if get_sarvartha_siddhi(weekday_idx, e['index']): ss_found.append(f"{start_t} - {end_t}")
-        if get_vidaal_yoga(weekday_idx, e['index']): vidaal_found.append(f"{start_t} - {end_t}")
-    sarvartha_str = ", ".join(ss_found) if ss_found else "None"
-    vidaal_str = ", ".join(vidaal_found) if vidaal_found else "None"
-    tripushkara_str = get_tripushkara_yoga(tithi_events, nak_events, weekday_idx, start_jd, end_jd, tz)
-    return {"anandadi": anandadi_str, "tamil": tamil_str, "sarvartha": sarvartha_str, "baana": baana_str, "netrama": n, "jeevanama": j, "tripushkara": tripushkara_str, "vidaal": vidaal_str}
+        d_start, d_end = dt_from_jd(e['start'], tz), dt_from_jd(e['end'], tz)
+        ends.append(d_end.strftime('%b %d, %I:%M %p') if d_end and e['end'] else "Full Night")
+        spans.append(f"{d_start.strftime('%I:%M %p') if d_start else '...'} - {d_end.strftime('%I:%M %p') if d_end and e['end'] else 'Full Night'}")
+    def upto(names): return " | ".join(f"{name} upto {end}" for name, end in zip(names, ends))
+    def windows(mask): return ", ".join(span for span, hit in zip(spans, mask) if hit) or "None"
+    return {
+        "anandadi": upto(rules['anandadi']), "tamil": upto(rules['tamil']), "baana": upto(rules['baana']),
+        "sarvartha": windows(rules['sarvartha']), "vidaal": windows(rules['vidaal']),
+        "netrama": rules['netram'][0], "jeevanama": rules['jeevan'][0],
+        "tripushkara": get_tripushkara_yoga(tithi_events, nak_events, weekday_idx, start_jd, end_jd, tz)
+    }
 
 def get_samvat_details(dt):
     year = dt.year
@@ -300,7 +758,7 @@ def get_samvat_details(dt):
     return {"vikram": vikram, "shaka": shaka, "gujarati": vikram, "samvatsara": "Pingala/Kalayukta"}
 
 def get_ritu_ayana_details(jd):
-    sun_trop = swe.calc_ut(jd, swe.SUN, swe.FLG_SWIEPH | swe.FLG_SPEED)[0][0]
+    sun_trop = swe.calc_ut(jd, swe.SUN, EPHE_FLAG | swe.FLG_SPEED)[0][0]
     if (sun_trop >= 270 and sun_trop < 360) or (sun_trop >= 0 and sun_trop < 90):
         ayana = "Uttarayana"; vedic_ayana = "Dakshinayana"
     else:
@@ -315,44 +773,6 @@ def get_ritu_ayana_details(jd):
     vedic_ritu = "Hemant (Prewinter)" if ritu == "Shishir (Winter)" else ritu
     return {"ritu": ritu, "vedic_ritu": vedic_ritu, "ayana": ayana, "vedic_ayana": vedic_ayana}
 
-def calculate_muhurtas(rise, set_, rise_next, weekday_idx):
-    day_len = set_ - rise
-    night_len = rise_next - set_
-    one_muhurta_day = day_len / 15.0
-    one_muhurta_night = night_len / 15.0
-    
-    brahma_start = rise - (2 * one_muhurta_night)
-    brahma_end = rise - (1 * one_muhurta_night)
-    pratah_start = brahma_start
-    pratah_end = rise
-    
-    abhijit_start = rise + (7 * one_muhurta_day)
-    abhijit_end = rise + (8 * one_muhurta_day)
-    abhijit_res = (abhijit_start, abhijit_end)
-
-    vijaya_start = rise + (10 * one_muhurta_day)
-    vijaya_end = rise + (11 * one_muhurta_day)
-    godhuli_start = set_ - (12.0/(24*60))
-    godhuli_end = set_ + (12.0/(24*60))
-    sayahna_start = set_
-    sayahna_end = set_ + one_muhurta_night
-    nishita_start = set_ + (7 * one_muhurta_night)
-    nishita_end = set_ + (8 * one_muhurta_night)
-    
-    DUR_MAP = {6: [14], 0: [8, 9], 1: [2, 4], 2: [8], 3: [5, 12], 4: [4, 9], 5: [1]}
-    dur_times = []
-    for seg in DUR_MAP[weekday_idx]:
-        s = rise + ((seg-1)*one_muhurta_day)
-        e = rise + (seg)*one_muhurta_day
-        dur_times.append((s, e))
-        
-    return {
-        "brahma": (brahma_start, brahma_end), "pratah": (pratah_start, pratah_end),
-        "abhijit": abhijit_res, "vijaya": (vijaya_start, vijaya_end),
-        "godhuli": (godhuli_start, godhuli_end), "sayahna": (sayahna_start, sayahna_end),
-        "nishita": (nishita_start, nishita_end), "dur_day": dur_times
-    }
-
 def get_nivas_shool_details(jd, weekday_idx, tithi_idx, nak_idx):
     SHOOL_DIR = {0: "West", 1: "East", 2: "North", 3: "North", 4: "South", 5: "West", 6: "East"}
     disha_shool = SHOOL_DIR[weekday_idx]
@@ -371,8 +791,8 @@ def get_nivas_shool_details(jd, weekday_idx, tithi_idx, nak_idx):
         "rahu_vasa": "South-West", "kumbha_chakra": "West"
     }
 
-def get_epoch_details(jd, dt):
-    ayanamsha = swe.get_ayanamsa(jd)
+def get_epoch_details(jd, dt, ayanamsa=None):
+    ayanamsha = ayanamsa_offset(jd, ayanamsa)
     kaliyuga_year = dt.year + 3101
     shaka_year = dt.year - 78
     mjd = jd - 2400000.5
@@ -380,149 +800,197 @@ def get_epoch_details(jd, dt):
     return {"kaliyuga": f"{kaliyuga_year} Years", "ayanamsha": f"{ayanamsha:.6f}", "kali_ahargana": f"{ahargana} Days", "rata_die": f"{int(jd - 1721424.5)}", "julian_date": dt.strftime("%B %d, %Y CE"), "julian_day": f"{jd:.2f}", "civil_date": f"{dt.strftime('%d %B')}, {shaka_year} Shaka", "mjd": f"{mjd:.2f}", "nirayana_date": f"{dt.strftime('%d %B')}, {shaka_year} Shaka"}
 
 def get_chandrabalam_tarabalam_details(moon_rashi_idx, day_nak_idx):
-    good_rashis = []
-    for r_idx, r_name in enumerate(RASHIS):
-        diff = (moon_rashi_idx - r_idx) % 12 + 1
-        if diff not in [6, 8, 12]: good_rashis.append({"name": r_name.split(' ')[0], "icon": RASHI_ICONS[r_name]})
-    good_naks = []
-    for n_idx, n_name in enumerate(NAKSHATRAS):
-        dist = (day_nak_idx - n_idx) % 9 + 1
-        if dist in [2, 4, 6, 8, 9]: good_naks.append({"name": n_name, "icon": NAK_ICONS.get(n_name, "")})
+    good_rashis = [{"name": RASHIS[r].split(' ')[0], "icon": RASHI_ICONS[RASHIS[r]]} for r in rule_tables.good_rashis(moon_rashi_idx)]
+    good_naks = [{"name": NAKSHATRAS[n], "icon": NAK_ICONS.get(NAKSHATRAS[n], "")} for n in rule_tables.good_taras(day_nak_idx)]
     return {
         "chandrabalam": {"good_rashis": good_rashis, "ashtama_chandra": ["Ashtama Chandra check required"]},
         "tarabalam": {"period_1": {"time": "Whole Day", "nakshatras": good_naks}, "period_2": {"time": "", "nakshatras": []}}
     }
 
 def get_panchaka_rahita_details(lagnas, tithi_idx, nak_idx, weekday_idx):
-    panchaka_list = []
-    V_WEEKDAY = {6:1, 0:2, 1:3, 2:4, 3:5, 4:6, 5:7}
-    v_wd = V_WEEKDAY[weekday_idx]
-    tithi_num = tithi_idx + 1
-    nak_num = nak_idx + 1
-    
-    for lagna in lagnas:
-        rashi_name = lagna['name']
-        for i, r in enumerate(RASHIS):
-            if r.startswith(rashi_name): lagna_num = i + 1; break
-        
-        total = tithi_num + v_wd + nak_num + lagna_num
-        remainder = total % 9
-        if remainder == 1: status, label = False, "Mrityu Panchaka"
-        elif remainder == 2: status, label = False, "Agni Panchaka"
-        elif remainder == 4: status, label = False, "Raja Panchaka"
-        elif remainder == 6: status, label = False, "Chora Panchaka"
-        elif remainder == 8: status, label = False, "Roga Panchaka"
-        else: status, label = True, "Good Muhurta"
-        panchaka_list.append({"label": label, "times": f"{lagna['start']} to {lagna['end']}", "is_good": status})
-    return panchaka_list
-
-def get_udaya_lagna_details(jd_start, jd_end, tz, lat, lon):
+    labels, good = rule_tables.panchaka(tithi_idx, weekday_idx, nak_idx, [lagna['index'] for lagna in lagnas])
+    return [{"label": label, "times": f"{lagna['start']} to {lagna['end']}", "is_good": bool(ok)} for lagna, label, ok in zip(lagnas, labels, good)]
+
+@functools.lru_cache(maxsize=256)
+def _ascendant_samples(jd_start, jd_end, lat, lon):
+    # Tropical ascendant once a minute; ayanamsa-independent, so shared by all modes
+    times = np.arange(jd_start, jd_end, 1.0 / (24 * 60))
+    ascs = np.empty(len(times))
+    for i, t in enumerate(times):
+        try: ascs[i] = swe.houses(float(t), lat, lon, b'P')[0][0]
+        except Exception: ascs[i] = np.nan
+    return times, ascs
+
+@functools.lru_cache(maxsize=4096)
+def _lagna_segments(jd_start, jd_end, lat, lon, ayanamsa):
+    times, ascs = _ascendant_samples(jd_start, jd_end, lat, lon)
+    ok = ~np.isnan(ascs)
+    times, ascs = times[ok], ascs[ok]
+    if not len(times): return ()
+    mid = (jd_start + jd_end) / 2
+    # swe.houses gives the true-equinox ascendant; removing nutation as well as the
+    # ayanamsa puts it on the grahas' mean-equinox zodiac. Before this was done,
+    # boundaries (and panchaka windows) came out up to a minute different.
+    offset = ayanamsa_offset(mid, ayanamsa) + nutation_longitude(mid)
+    signs = (((ascs - offset) % 360) // 30).astype(int)
+    change = np.flatnonzero(signs[1:] != signs[:-1]) + 1
+    starts = np.concatenate(([jd_start], times[change]))
+    ends = np.concatenate((times[change], [jd_end]))
+    return tuple((int(signs[i]), float(s), float(e)) for i, s, e in zip(np.concatenate(([0], change)), starts, ends))
+
+def get_udaya_lagna_details(jd_start, jd_end, tz, lat, lon, ayanamsa=None):
+    q_lat, q_lon = quantize_location(lat, lon)
+    # Cell window in cell time, then back to the exact longitude (sidereal rate)
+    solar_shift = (lon - q_lon) / 360.0
+    sidereal_shift = (lon - q_lon) / 360.9856
+    segments = _lagna_segments(round(jd_start + solar_shift, 6), round(jd_end + solar_shift, 6), q_lat, q_lon, resolve_ayanamsa(ayanamsa))
     lagnas = []
-    swe.set_ephe_path(EPHEMERIS_PATH)
-    swe.set_sid_mode(SIDEREAL_MODE)
-    curr_jd = jd_start
-    last_sign_idx = -1
-    lagna_start_jd = jd_start
-    step = 1.0 / (24 * 60) 
-    while curr_jd < jd_end:
-        try:
-            trop_asc = swe.houses(curr_jd, lat, lon, b'P')[0][0]
-            ayan = swe.get_ayanamsa(curr_jd)
-            sid_asc = (trop_asc - ayan) % 360
-            curr_sign_idx = int(sid_asc / 30)
-            if last_sign_idx != -1 and curr_sign_idx != last_sign_idx:
-                rashi_name = RASHIS[last_sign_idx]
-                icon = RASHI_ICONS.get(rashi_name, "")
-                lagnas.append({"name": rashi_name.split(' ')[0], "icon": icon, "start": dt_from_jd(lagna_start_jd, tz).strftime("%I:%M %p"), "end": dt_from_jd(curr_jd, tz).strftime("%I:%M %p")})
-                lagna_start_jd = curr_jd
-            last_sign_idx = curr_sign_idx
-        except: pass
-        curr_jd += step
-    if last_sign_idx != -1:
-        rashi_name = RASHIS[last_sign_idx]
-        icon = RASHI_ICONS.get(rashi_name, "")
-        lagnas.append({"name": rashi_name.split(' ')[0], "icon": icon, "start": dt_from_jd(lagna_start_jd, tz).strftime("%I:%M %p"), "end": dt_from_jd(jd_end, tz).strftime("%I:%M %p")})
+    for i, (sign_idx, s, e) in enumerate(segments):
+        s = jd_start if i == 0 else max(jd_start, s - sidereal_shift)
+        e = jd_end if i == len(segments) - 1 else min(jd_end, e - sidereal_shift)
+        rashi_name = RASHIS[sign_idx]
+        lagnas.append({"name": rashi_name.split(' ')[0], "icon": RASHI_ICONS.get(rashi_name, ""), "index": sign_idx, "start": dt_from_jd(s, tz).strftime("%I:%M %p"), "end": dt_from_jd(e, tz).strftime("%I:%M %p")})
     return lagnas
 
-def get_festivals_details(jd, tithi_idx, sun_long, dt_obj, nak_idx, moon_rashi_idx):
+def get_festival_image_url(name):
+    for key, url in FESTIVAL_IMAGES_STATIC.items():
+        if key in name: return url
+    seed = sum(ord(c) for c in name)
+    safe_name = urllib.parse.quote(name)
+    return f"https://image.pollinations.ai/prompt/Hindu%20festival%20{safe_name}%20devotional%20art?width=300&height=200&nologo=true&seed={seed}"
+
+def get_annual_festival_name(lunar, tithi_idx):
+    # Annual festivals fall in the nija month, never the adhika one
+    if lunar['is_adhika']: return None
+    return FESTIVAL_DB.get((lunar['month_idx'], 0 if tithi_idx < 15 else 1, tithi_idx % 15))
+
+def get_masik_tithi_festivals(tithi_idx):
     paksha_code = 0 if tithi_idx < 15 else 1
     tithi_in_paksha = tithi_idx % 15
-    sun_sign_idx = int(sun_long / 30)
-    lunar_month_idx = (sun_sign_idx + 1) % 12 
+    names = []
+    if paksha_code == 0 and tithi_in_paksha == 3: names.append("Vinayaka Chaturthi")
+    if paksha_code == 1 and tithi_in_paksha == 3: names.append("Sankashti Chaturthi")
+    if paksha_code == 0 and tithi_in_paksha == 5: names.append("Skanda Sashti")
+    if paksha_code == 0 and tithi_in_paksha == 7: names.append("Masik Durgashtami")
+    if paksha_code == 1 and tithi_in_paksha == 7: names.append("Kalashtami")
+    if tithi_in_paksha == 10: prefix = "Shukla" if paksha_code == 0 else "Krishna"; names.append(f"{prefix} Ekadashi")
+    if tithi_in_paksha == 12: names.append("Pradosh Vrat")
+    if paksha_code == 1 and tithi_in_paksha == 13: names.append("Masik Shivaratri")
+    if paksha_code == 1 and tithi_in_paksha == 14: names.append("Amavasya")
+    if paksha_code == 0 and tithi_in_paksha == 14: names.append("Purnima")
+    return names
+
+def get_masik_nakshatra_festivals(nak_idx):
+    if nak_idx == 2: return ["Masik Karthigai"]
+    if nak_idx == 3: return ["Rohini Vrat"]
+    return []
+
+def get_festivals_details(jd, tithi_idx, sun_long, dt_obj, nak_idx, moon_rashi_idx, ayanamsa=None):
     festivals = []
-    def get_image_url(name):
-        for key, url in FESTIVAL_IMAGES_STATIC.items():
-            if key in name: return url
-        seed = sum(ord(c) for c in name)
-        safe_name = urllib.parse.quote(name)
-        return f"https://image.pollinations.ai/prompt/Hindu%20festival%20{safe_name}%20devotional%20art?width=300&height=200&nologo=true&seed={seed}"
     def add_fest(name):
-        if not any(f['name'] == name for f in festivals):
-            festivals.append({"name": name, "image_url": get_image_url(name)})
-    key = (lunar_month_idx, paksha_code, tithi_in_paksha)
-    if key in FESTIVAL_DB: add_fest(FESTIVAL_DB[key])
-    greg_key = (dt_obj.month, dt_obj.day)
-    if greg_key in GREGORIAN_FESTIVALS: add_fest(GREGORIAN_FESTIVALS[greg_key])
-    if paksha_code == 0 and tithi_in_paksha == 3: add_fest("Vinayaka Chaturthi")
-    if paksha_code == 1 and tithi_in_paksha == 3: add_fest("Sankashti Chaturthi")
-    if paksha_code == 0 and tithi_in_paksha == 5: add_fest("Skanda Sashti")
-    if paksha_code == 0 and tithi_in_paksha == 7: add_fest("Masik Durgashtami")
-    if paksha_code == 1 and tithi_in_paksha == 7: add_fest("Kalashtami")
-    if tithi_in_paksha == 10: prefix = "Shukla" if paksha_code == 0 else "Krishna"; add_fest(f"{prefix} Ekadashi")
-    if tithi_in_paksha == 12: add_fest("Pradosh Vrat")
-    if paksha_code == 1 and tithi_in_paksha == 13: add_fest("Masik Shivaratri")
-    if paksha_code == 1 and tithi_in_paksha == 14: add_fest("Amavasya")
-    if paksha_code == 0 and tithi_in_paksha == 14: add_fest("Purnima")
-    if nak_idx == 2: add_fest("Masik Karthigai")
-    if nak_idx == 3: add_fest("Rohini Vrat")
+        if name and not any(f['name'] == name for f in festivals):
+            festivals.append({"name": name, "image_url": get_festival_image_url(name)})
+    add_fest(get_annual_festival_name(get_lunar_month_details(jd, ayanamsa), tithi_idx))
+    add_fest(GREGORIAN_FESTIVALS.get((dt_obj.month, dt_obj.day)))
+    for name in get_masik_tithi_festivals(tithi_idx): add_fest(name)
+    for name in get_masik_nakshatra_festivals(nak_idx): add_fest(name)
     return festivals
 
 # --- HOROSCOPE CALCULATION ---
-def get_horoscope_by_birth_details(loc, date_str, time_str):
+HOROSCOPE_BODIES = ["Lagna", "Sun", "Moon", "Mars", "Merc", "Jup", "Ven", "Sat", "Rahu", "Ketu"]
+HOROSCOPE_VARGAS = (1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60)
+
+def get_birth_longitudes(jd, lat, lon, ayanamsa=None):
+    # Sidereal longitudes in HOROSCOPE_BODIES order (GRAHAS order after the Lagna), computed once per birth moment
+    offset = ayanamsa_offset(jd, ayanamsa)
+    lagna_deg = (swe.houses(jd, lat, lon, b'P')[1][0] - nutation_longitude(jd) - offset) % 360
+    return np.array([lagna_deg] + [(tropical_longitude(jd, g) - offset) % 360 for g in range(len(GRAHAS))])
+
+def get_horoscope_by_birth_details(loc, date_str, time_str, divisions=HOROSCOPE_VARGAS, ayanamsa=None):
     setup_swisseph()
+    ayanamsa = resolve_ayanamsa(ayanamsa)
     try:
         dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
     except: return None
 
     tz = loc['tz']
-    local_dt = tz.localize(dt)
-    jd = swe.julday(local_dt.year, local_dt.month, local_dt.day, local_dt.hour + local_dt.minute/60.0 + local_dt.second/3600.0)
-
-    # Calculate Planets
-    flags = swe.FLG_SIDEREAL | swe.FLG_SPEED
-    planet_map = {0: swe.SUN, 1: swe.MOON, 2: swe.MARS, 3: swe.MERCURY, 4: swe.JUPITER, 5: swe.VENUS, 6: swe.SATURN, 7: swe.MEAN_NODE, 8: swe.MEAN_NODE}
+    jd = jd_from_dt(tz.localize(dt))
+    longitudes = get_birth_longitudes(jd, loc['lat'], loc['lon'], ayanamsa)
     
-    chart_data = {i: [] for i in range(12)} 
+    # All D-charts from the same longitude vector
+    varga_signs = compute_vargas(longitudes, sorted(set(divisions) | {1}))
+    vargas = {d: {"name": VARGA_NAMES[d], "chart": varga_chart_data(signs, HOROSCOPE_BODIES), "signs": {b: RASHIS[s].split(' ')[0] for b, s in zip(HOROSCOPE_BODIES, signs)}} for d, signs in varga_signs.items()}
     
-    # Lagna
-    cusps, ascmc = swe.houses(jd, loc['lat'], loc['lon'], b'P')
-    lagna_deg = ascmc[0]
-    lagna_rashi = int(lagna_deg / 30)
-    chart_data[lagna_rashi].append("Lagna")
-    
-    moon_long = 0
-    
-    # Planets
-    for i in range(8):
-        body = planet_map[i]
-        res = swe.calc_ut(jd, body, flags)[0]
-        deg = res[0]
-        if i == 8: deg = (deg + 180) % 360 # Ketu
-        if i == 1: moon_long = deg
-            
-        rashi = int(deg / 30)
-        p_name = ["Sun", "Moon", "Mars", "Merc", "Jup", "Ven", "Sat", "Rahu", "Ketu"][i]
-        chart_data[rashi].append(p_name)
+    lagna_rashi = int(varga_signs[1][0])
+    moon_long = longitudes[2]
     
     # ADDED: Nakshatra Calc
     nak_idx = int(moon_long / 13.333333333)
     pada = int((moon_long % 13.333333333) / 3.333333333) + 1
     nak_str = f"{NAKSHATRAS[nak_idx]} ({pada} Pada)"
 
-    return {"chart": chart_data, "lagna": RASHIS[lagna_rashi], "moon_sign": RASHIS[int(moon_long/30)], "nakshatra": nak_str}
+    # Vimshottari: maha periods plus the running maha/antar/pratyantar
+    def fmt_period(p):
+        return {**p, "start_fmt": dt_from_jd(p['start'], tz).strftime('%d %b %Y'), "end_fmt": dt_from_jd(p['end'], tz).strftime('%d %b %Y')}
+    now_jd = jd_from_dt(datetime.now(pytz.utc))
+    dasha = {"maha": [fmt_period(p) for p in iter_dasha(moon_long, jd, depth=1)], "current": [fmt_period(p) for p in dasha_at(moon_long, jd, now_jd, depth=3)]}
+
+    return {"chart": vargas[1]["chart"], "lagna": RASHIS[lagna_rashi], "moon_sign": RASHIS[int(moon_long/30)], "nakshatra": nak_str, "moon_pada_idx": nak_idx * 4 + pada - 1, "vargas": vargas, "dasha": dasha, "jd": jd, "longitudes": longitudes.tolist(), "ayanamsa": ayanamsa}
+
+# --- COMPUTATION BUDGETS ---
+# Range views take a Deadline and check it between days; days not reached
+# come back marked pending. Each run is recorded per view in BUDGET_STATS.
+class Deadline:
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.at = None if seconds is None else self.started + seconds
+
+    def expired(self):
+        return self.at is not None and time.monotonic() >= self.at
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+BUDGET_STATS = {}
+_budget_lock = threading.Lock()
+
+def record_budget(view, deadline, pending):
+    # pending: units of work (days, range computations) the deadline left undone
+    # Overrun: the deadline cut the run short; overshoot: how far past it the last unit ran
+    overshoot = max(0.0, deadline.elapsed() - deadline.seconds) if deadline.seconds is not None else 0.0
+    with _budget_lock:
+        stats = BUDGET_STATS.setdefault(view, {"runs": 0, "overruns": 0, "pending_units": 0, "max_overshoot_s": 0.0})
+        stats["runs"] += 1
+        if pending:
+            stats["overruns"] += 1
+            stats["pending_units"] += pending
+        stats["max_overshoot_s"] = round(max(stats["max_overshoot_s"], overshoot), 3)
+    if pending: print(f"Budget overrun in {view}: {pending} units pending after {deadline.elapsed():.2f}s")
+
+def get_budget_stats():
+    with _budget_lock:
+        return {view: dict(stats) for view, stats in BUDGET_STATS.items()}
+
+def get_month_days(loc, year, month, ayanamsa=None, deadline=None):
+    # Month grid days: day -> fetch_month_day_data, {"error": True} or {"pending": True}
+    deadline = deadline or Deadline()
+    days = {}
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        if deadline.expired():
+            days[day] = {"pending": True}
+            continue
+        date_str = f"{year}-{month:02d}-{day:02d}"
+        try:
+            days[day] = fetch_month_day_data(loc, date_str, ayanamsa)
+        except Exception as e:
+            print(f"Error for {date_str}: {e}")
+            days[day] = {"error": True}
+    record_budget("month", deadline, sum(1 for d in days.values() if d.get("pending")))
+    return days
 
 # --- MUHURTHA CALCULATOR ---
-def get_monthly_muhurthas(loc, year, month):
+def get_monthly_muhurthas(loc, year, month, ayanamsa=None, deadline=None):
     RULES = {
         "marriage": {"naks": ["Rohini", "Mrigashira", "Magha", "Uttara Phalguni", "Hasta", "Swati", "Anuradha", "Mula", "Uttara Ashadha", "Uttara Bhadrapada", "Revati"], "tithis": ["Dwitiya", "Tritiya", "Panchami", "Saptami", "Dashami", "Ekadashi", "Trayodashi"], "exclude_days": [1, 6]},
         "gruha": {"naks": ["Rohini", "Mrigashira", "Pushya", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Anuradha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Uttara Bhadrapada", "Revati"], "tithis": ["Dwitiya", "Tritiya", "Panchami", "Shashthi", "Saptami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi"], "exclude_days": [1, 6]},
@@ -531,12 +999,17 @@ def get_monthly_muhurthas(loc, year, month):
     }
     cal = calendar.monthcalendar(year, month)
     results = {k: [] for k in RULES.keys()}
+    deadline = deadline or Deadline()
+    pending = []
     for week in cal:
         for day in week:
             if day == 0: continue
             date_str = f"{year}-{month:02d}-{day:02d}"
+            if deadline.expired():
+                pending.append(date_str)
+                continue
             try:
-                data = fetch_month_day_data(loc, date_str)
+                data = fetch_month_day_data(loc, date_str, ayanamsa)
                 dt_obj = datetime(year, month, day)
                 weekday = dt_obj.weekday()
                 curr_nak = data['nakshatra'].split(' ')[0]
@@ -549,12 +1022,127 @@ def get_monthly_muhurthas(loc, year, month):
                     if "Amavasya" in curr_tithi or "Chaturthi" in tithi_name or "Navami" in tithi_name: tithi_match = False
                     if nak_match and tithi_match:
                         results[cat].append({"date": f"{day} {calendar.month_name[month]}", "day_name": dt_obj.strftime("%A"), "nakshatra": curr_nak, "tithi": curr_tithi, "full_date": date_str})
-            except: continue
+            except Exception: continue
+    first, last = date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    # The month's Tripushkara windows are one range computation: all or nothing
+    tripushkara_pending = deadline.expired()
+    tripushkara = [] if tripushkara_pending else get_tripushkara_windows(loc, first, last, ayanamsa)
+    results["tripushkara"] = [{"date": f"{w['date'].day} {calendar.month_name[month]}", "day_name": w['date'].strftime("%A"), "nakshatra": w['nakshatra'], "tithi": w['tithi'], "full_date": w['date'].isoformat(),
+                               "time": f"{dt_from_jd(w['start'], loc['tz']).strftime('%b %d, %I:%M %p')} - {dt_from_jd(w['end'], loc['tz']).strftime('%b %d, %I:%M %p')}"}
+                              for w in tripushkara]
+    results["pending"] = pending
+    results["tripushkara_pending"] = tripushkara_pending
+    record_budget("muhurtha", deadline, len(pending) + tripushkara_pending)
     return results
 
+# --- DAILY STORE ---
+def get_store_row(loc, dt, ayanamsa=None):
+    # The store is built with DEFAULT_AYANAMSA
+    if PANCHANG_STORE is None or resolve_ayanamsa(ayanamsa) != DEFAULT_AYANAMSA: return None
+    return PANCHANG_STORE.read_day(loc['lat'], loc['lon'], dt)
+
+def build_store_rows(loc, start_date, end_date):
+    setup_swisseph()
+    tz = loc['tz']
+    days = (end_date - start_date).days + 1
+    rows = np.zeros(days, dtype=STORE_DTYPE)
+    rises = np.empty(days + 1)
+    for i in range(days + 1):
+        d = start_date + timedelta(days=i)
+        jd_noon = jd_from_dt(tz.localize(datetime(d.year, d.month, d.day, 12, 0)))
+        rise, set_ = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
+        rises[i] = rise
+        if i == days: break
+        rows[i]['set'] = set_
+        rows[i]['moon_rise'], rows[i]['moon_set'] = calc_moon_rise_set(jd_noon, loc['lat'], loc['lon'])
+    rows['rise'], rows['rise_next'] = rises[:-1], rises[1:]
+    first = jd_from_dt(tz.localize(datetime(start_date.year, start_date.month, start_date.day)))
+    for kind, col, start_col, end_col in (("tithi", "tithi", "tithi_start", "tithi_end"), ("nakshatra", "nakshatra", "nak_start", "nak_end"), ("yoga", "yoga", None, "yoga_end"), ("karana", "karana", None, "karana_end")):
+        table = get_transition_table(kind, first - 1, first + days + 2)
+        at_rise = lookup_transitions(table, rows['rise'])
+        rows[col] = table['index'][at_rise]
+        rows[end_col] = table['end'][at_rise]
+        if start_col: rows[start_col] = table['start'][at_rise]
+    w_idx = np.array([(start_date + timedelta(days=i)).weekday() for i in range(days)])
+    divisions = day_divisions(rows['rise'], rows['set'], rows['rise_next'], w_idx)
+    for name in ('rahu', 'yama', 'guli'): rows[f'{name}_start'] = divisions[name][:, 0]
+    return rows
+
+def get_day_division_table(loc, start_date, end_date):
+    # Kalams, muhurtas, choghadiya and hora for a whole range as arrays (see day_division.py)
+    setup_swisseph()
+    tz = loc['tz']
+    days = (end_date - start_date).days + 1
+    rise_set = np.empty((days + 1, 2))
+    for i in range(days + 1):
+        d = start_date + timedelta(days=i)
+        jd_noon = jd_from_dt(tz.localize(datetime(d.year, d.month, d.day, 12, 0)))
+        rise_set[i] = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
+    w_idx = np.array([(start_date + timedelta(days=i)).weekday() for i in range(days)])
+    return day_divisions(rise_set[:-1, 0], rise_set[:-1, 1], rise_set[1:, 0], w_idx)
+
 # --- Main Fetch Function ---
-def fetch_panchang(loc_str_or_dict, date_str):
+# Event lists in a result, with the table their names come from (see panchang_codec.py)
+EVENT_LISTS = {"tithi": TITHIS, "nakshatra": NAKSHATRAS, "yoga": YOGAS, "karana": None, "moon_pada": PADA_NAMES, "sun_pada": PADA_NAMES}
+
+def fmt_day_time(jd, tz, day):
+    # Time of day, with the date only when it falls on another day
+    d = dt_from_jd(jd, tz)
+    if not d: return "---"
+    return d.strftime('%b %d, %I:%M %p') if d.date() != day else d.strftime('%I:%M %p')
+
+# '%I:%M %p' for every minute of the day
+CLOCK_TIMES = [f"{(m // 60 - 1) % 12 + 1:02d}:{m % 60:02d} {'AM' if m < 720 else 'PM'}" for m in range(1440)]
+
+MONTH_ABBRS = ["", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+def fmt_day_times(jds, tz, day):
+    # fmt_day_time over many JDs at once (None or NaN give "---"). The UTC clock
+    # time is split and truncated exactly as swe.revjul and dt_from_jd do; the
+    # zone offset is looked up once when the span has no offset change.
+    jds_all = [np.nan if j is None else j for j in jds]
+    jds = np.array(jds_all, dtype=np.float64)
+    ok = ~np.isnan(jds)
+    if not ok.any(): return ["---"] * len(jds)
+    jds = jds[ok]
+    whole = np.floor(jds + 0.5)
+    h_dec = (jds - whole + 0.5) * 24.0
+    h = np.trunc(h_dec)
+    mins = (h_dec - h) * 60
+    mi = np.trunc(mins)
+    utc = h * 3600 + mi * 60 + np.trunc((mins - mi) * 60)
+    try:
+        first, last = (tz.fromutc(datetime.fromordinal(int(whole[i]) - 1721425) + timedelta(seconds=float(utc[i]))).utcoffset()
+                       for i in (jds.argmin(), jds.argmax()))
+    except (ValueError, OverflowError): first, last = None, None
+    if first is None or first != last:
+        return [fmt_day_time(None if j != j else j, tz, day) for j in jds_all]
+    local = utc + first.total_seconds()
+    # Proleptic Gregorian ordinals: JD 1721425.5 is 0001-01-01 00:00 UT
+    ordinal = (whole - 1721425 + np.floor(local / 86400)).astype(np.int64)
+    minute = (np.floor(local % 86400 / 60)).astype(np.int64)
+    prefixes = {day.toordinal(): ""}
+    formatted = []
+    for o, m in zip(ordinal.tolist(), minute.tolist()):
+        if o not in prefixes:
+            d = date.fromordinal(o)
+            prefixes[o] = f"{MONTH_ABBRS[d.month]} {d.day:02d}, "
+        formatted.append(prefixes[o] + CLOCK_TIMES[m])
+    if ok.all(): return formatted
+    it = iter(formatted)
+    return [next(it) if valid else "---" for valid in ok.tolist()]
+
+def decorate_events(data, tz, day):
+    # Formatted start/end (one fmt_day_times pass over every list) and icons
+    items = [item for k in EVENT_LISTS for item in data[k]]
+    times = fmt_day_times([t for item in items for t in (item['start'], item['end'])], tz, day)
+    for item, start_fmt, end_fmt in zip(items, times[::2], times[1::2]): item['start_fmt'], item['end_fmt'] = start_fmt, end_fmt
+    for item in data['tithi']: item['icon'] = TITHI_ICONS.get(item['name'], "🌑")
+    for item in data['nakshatra']: item['icon'] = NAK_ICONS.get(item['name'], "✨")
+
+def fetch_panchang(loc_str_or_dict, date_str, ayanamsa=None):
     setup_swisseph()
+    ayanamsa = resolve_ayanamsa(ayanamsa)
     if isinstance(loc_str_or_dict, dict): loc = loc_str_or_dict
     else: loc = get_location(loc_str_or_dict)
     if not loc: return {"error": "Location not found"}
@@ -562,124 +1150,123 @@ def fetch_panchang(loc_str_or_dict, date_str):
     dt = datetime.strptime(date_str, "%Y-%m-%d")
     tz = loc['tz']
     jd_noon = jd_from_dt(tz.localize(datetime(dt.year, dt.month, dt.day, 12, 0)))
-    rise, set_ = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
-    moon_rise, moon_set = calc_moon_rise_set(jd_noon, loc['lat'], loc['lon'])
-    rise_next, _ = calc_sun_rise_set(jd_noon + 1, loc['lat'], loc['lon'])
-    sun_long, moon_long = get_pos(rise)
+    row = get_store_row(loc, dt, ayanamsa)
+    if row is not None:
+        rise, set_, rise_next, moon_rise, moon_set = (float(row[k]) for k in ('rise', 'set', 'rise_next', 'moon_rise', 'moon_set'))
+    else:
+        rise, set_ = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
+        moon_rise, moon_set = calc_moon_rise_set(jd_noon, loc['lat'], loc['lon'])
+        rise_next, _ = calc_sun_rise_set(jd_noon + 1, loc['lat'], loc['lon'])
+    sun_state = sun_day_state(jd_noon, loc['lat'], loc['lon'])
+    sun_long, moon_long = get_pos(rise, ayanamsa)
     moon_rashi_idx = int(moon_long / 30)
     sun_rashi_idx = int(sun_long / 30)
     w_idx = dt_from_jd(rise, tz).weekday()
     
-    day_len = set_ - rise
-    def get_kalam(k_map):
-        s = rise + ((k_map[w_idx]-1) * (day_len/8))
-        d_start = dt_from_jd(s, tz)
-        d_end = dt_from_jd(s + day_len/8, tz)
-        if not d_start or not d_end: return "---"
-        s_fmt = d_start.strftime('%b %d, %I:%M %p') if d_start.date() != dt.date() else d_start.strftime('%I:%M %p')
-        e_fmt = d_end.strftime('%b %d, %I:%M %p') if d_end.date() != dt.date() else d_end.strftime('%I:%M %p')
-        return f"{s_fmt} - {e_fmt}"
-    rahu_time = get_kalam(RAHU_KEY)
-    yama_time = get_kalam(YAMA_KEY)
-    guli_time = get_kalam(GULI_KEY)
+    divisions = day_divisions(rise, set_, rise_next, w_idx)
 
     samvat = get_samvat_details(dt)
     ritu_ayana = get_ritu_ayana_details(rise)
-    muhurtas = calculate_muhurtas(rise, set_, rise_next, w_idx)
     tithi_idx = int(((moon_long - sun_long) % 360) / 12)
     nak_idx = int(moon_long / 13.333333)
     sun_nak_idx = int(sun_long / 13.333333)
     nivas_shool = get_nivas_shool_details(jd_noon, w_idx, tithi_idx, nak_idx)
-    epoch = get_epoch_details(jd_noon, dt)
+    epoch = get_epoch_details(jd_noon, dt, ayanamsa)
     chandrabalam_tarabalam = get_chandrabalam_tarabalam_details(moon_rashi_idx, nak_idx)
-    udaya_lagna = get_udaya_lagna_details(rise, rise_next, tz, loc['lat'], loc['lon'])
+    udaya_lagna = get_udaya_lagna_details(rise, rise_next, tz, loc['lat'], loc['lon'], ayanamsa)
     panchaka_rahita = get_panchaka_rahita_details(udaya_lagna, tithi_idx, nak_idx, w_idx)
-    festivals = get_festivals_details(rise, tithi_idx, sun_long, dt, nak_idx, moon_rashi_idx)
+    festivals = get_festivals_details(rise, tithi_idx, sun_long, dt, nak_idx, moon_rashi_idx, ayanamsa)
     dinamana = fmt_duration(rise, set_)
     ratrimana = fmt_duration(set_, rise_next)
     madhyahna_jd = rise + (set_ - rise) / 2
     
-    def fmt_dt(jd): 
-        d = dt_from_jd(jd, tz)
-        if not d: return "---"
-        return d.strftime('%b %d, %I:%M %p') if d.date() != dt.date() else d.strftime('%I:%M %p')
+    fmt_dt = lambda jd: fmt_day_time(jd, tz, dt.date())
     def fmt_range(start, end): return f"{fmt_dt(start)} - {fmt_dt(end)}"
     
-    fn_tithi = lambda j: (int((get_pos(j)[1] - get_pos(j)[0]) % 360 / 12), 0)
-    fn_nak = lambda j: (int(get_pos(j)[1] / 13.333333333), 0)
-    fn_yoga = lambda j: (int((get_pos(j)[1] + get_pos(j)[0]) % 360 / 13.333333333), 0)
-    fn_karana = lambda j: (int((get_pos(j)[1] - get_pos(j)[0]) % 360 / 6), 0)
+    fn_tithi = lambda j: (int(elongation(j) / 12), 0)
+    fn_nak = lambda j: (int(graha_longitude(j, 1, ayanamsa) / 13.333333333), 0)
+    fn_yoga = lambda j: (int(sum(get_pos(j, ayanamsa)) % 360 / 13.333333333), 0)
+    fn_karana = lambda j: (int(elongation(j) / 6), 0)
     
     tithi_events = get_events(rise, rise_next, fn_tithi, TITHIS, 30)
     nak_events = get_events(rise, rise_next, fn_nak, NAKSHATRAS, 27)
     calc_timings = get_calculated_timings(nak_events, w_idx, sun_nak_idx, tithi_events, rise, rise_next, tz)
     
     nk_start = nak_events[0]['start'] if nak_events else rise
-    v_s = nk_start + (VARJYAM_STARTS[nak_idx]/60.0)
-    varjyam_time = fmt_range(v_s, v_s + 4/60.0)
-    a_s = nk_start + (AMRIT_STARTS[nak_idx]/60.0)
-    amrit_time = fmt_range(a_s, a_s + 4/60.0)
+    varjyam_time = fmt_range(*get_nakshatra_windows(nk_start, nak_idx, VARJYAM_STARTS))
+    amrit_time = fmt_range(*get_nakshatra_windows(nk_start, nak_idx, AMRIT_STARTS))
+    choghadiya = divisions['choghadiya']
+    horas = divisions['hora']
+    grahan = [{"name": g['name'], "type": g['type'], "magnitude": g['magnitude'], "sparsha": fmt_dt(g['begin']), "madhya": fmt_dt(g['max']), "moksha": fmt_dt(g['end']),
+               "visible": fmt_range(g['visible_begin'], g['visible_end']), "sutak": fmt_range(g['sutak_start'], g['sutak_end']) if g['sutak_start'] else None}
+              for g in get_eclipses(loc['lat'], loc['lon'], rise, rise_next)]
     
+    if LOCATION_GRID_DEG: data_grid = {"grid_deg": LOCATION_GRID_DEG, "max_error_min": round(max_quantization_error_minutes(loc['lat']), 2)}
+    else: data_grid = None
+
     data = {
-        "meta": {"location": loc['name'], "date": dt_from_jd(rise, tz).strftime("%A, %d %B %Y"), "sunrise": fmt_dt(rise), "sunset": fmt_dt(set_), "moonrise": fmt_dt(moon_rise), "moonset": fmt_dt(moon_set)},
+        "meta": {"location": loc['name'], "location_grid": data_grid, "ayanamsa": ayanamsa, "date": dt_from_jd(rise, tz).strftime("%A, %d %B %Y"), "sunrise": fmt_dt(rise), "sunset": fmt_dt(set_), "moonrise": fmt_dt(moon_rise), "moonset": fmt_dt(moon_set), "sun_state": sun_state, "sun_note": SUN_STATE_NOTES.get(sun_state)},
+        "jd": {"sunrise": rise, "sunset": set_, "next_sunrise": rise_next, "moonrise": moon_rise, "moonset": moon_set},
         "details": {"moonsign": RASHIS[moon_rashi_idx], "sunsign": RASHIS[sun_rashi_idx], "samvat": samvat, "ritu_ayana": ritu_ayana, "dinamana": dinamana, "ratrimana": ratrimana, "madhyahna": fmt_dt(madhyahna_jd), "nivas_shool": nivas_shool, "epoch": epoch, "chandrabalam_tarabalam": chandrabalam_tarabalam, "panchaka_rahita": panchaka_rahita, "udaya_lagna": udaya_lagna, "festivals": festivals},
         "tithi": tithi_events, "nakshatra": nak_events, "yoga": get_events(rise, rise_next, fn_yoga, YOGAS, 27), "karana": get_events(rise, rise_next, fn_karana, [], 60, True),
-        "moon_pada": get_events(rise, rise_next, lambda j: (int(get_pos(j)[1] / 3.333333333), 0), PADA_NAMES, 108),
-        "sun_pada": get_events(rise, rise_next, lambda j: (int(get_pos(j)[0] / 3.333333333), 0), PADA_NAMES, 108),
+        "moon_pada": get_events(rise, rise_next, lambda j: (int(graha_longitude(j, 1, ayanamsa) / 3.333333333), 0), PADA_NAMES, 108),
+        "sun_pada": get_events(rise, rise_next, lambda j: (int(graha_longitude(j, 0, ayanamsa) / 3.333333333), 0), PADA_NAMES, 108),
         "timings": {
-            "brahma": fmt_range(*muhurtas["brahma"]), "pratah": fmt_range(*muhurtas["pratah"]), "vijaya": fmt_range(*muhurtas["vijaya"]), "godhuli": fmt_range(*muhurtas["godhuli"]), "sayahna": fmt_range(*muhurtas["sayahna"]), "nishita": fmt_range(*muhurtas["nishita"]), "dur_day": ", ".join([fmt_range(s, e) for s, e in muhurtas["dur_day"]]),
+            "brahma": fmt_range(*divisions["brahma"][0]), "pratah": fmt_range(*divisions["pratah"][0]), "abhijit": fmt_range(*divisions["abhijit"][0]), "vijaya": fmt_range(*divisions["vijaya"][0]), "godhuli": fmt_range(*divisions["godhuli"][0]), "sayahna": fmt_range(*divisions["sayahna"][0]), "nishita": fmt_range(*divisions["nishita"][0]), "dur_day": ", ".join([fmt_range(s, e) for s, e in divisions["dur_day"][0] if not np.isnan(s)]),
             "sarvartha": calc_timings["sarvartha"], "baana": calc_timings["baana"], "vidaal": calc_timings["vidaal"], "anandadi": calc_timings["anandadi"], "tamil": calc_timings["tamil"], "jeevanama": calc_timings["jeevanama"], "netrama": calc_timings["netrama"], "tripushkara": calc_timings["tripushkara"],
-            "rahu": rahu_time, "yama": yama_time, "guli": guli_time, "varjyam": varjyam_time, "amrit": amrit_time
-        }
+            "rahu": fmt_range(*divisions["rahu"][0]), "yama": fmt_range(*divisions["yama"][0]), "guli": fmt_range(*divisions["guli"][0]), "varjyam": varjyam_time, "amrit": amrit_time
+        },
+        "choghadiya": [{"name": CHOGHADIYA_NAMES[l], "is_good": bool(g), "period": "Day" if i < 8 else "Night", "start_fmt": fmt_dt(s), "end_fmt": fmt_dt(e)} for i, (l, g, s, e) in enumerate(zip(choghadiya["lord"][0], choghadiya["good"][0], choghadiya["start"][0], choghadiya["end"][0]))],
+        "grahan": grahan,
+        "hora": [{"lord": HORA_LORDS[l], "period": "Day" if i < 12 else "Night", "start_fmt": fmt_dt(s), "end_fmt": fmt_dt(e)} for i, (l, s, e) in enumerate(zip(horas["lord"][0], horas["start"][0], horas["end"][0]))]
     }
     
-    if isinstance(muhurtas["abhijit"], tuple): data["timings"]["abhijit"] = fmt_range(*muhurtas["abhijit"])
-    else: data["timings"]["abhijit"] = muhurtas["abhijit"]
-    
-    for item in data['tithi']: item['start_fmt'] = fmt_dt(item['start']); item['end_fmt'] = fmt_dt(item['end']); item['icon'] = TITHI_ICONS.get(item['name'], "🌑")
-    for item in data['nakshatra']: item['start_fmt'] = fmt_dt(item['start']); item['end_fmt'] = fmt_dt(item['end']); item['icon'] = NAK_ICONS.get(item['name'], "✨")
-    for k in ['yoga', 'karana', 'moon_pada', 'sun_pada']:
-        for item in data[k]: item['start_fmt'] = fmt_dt(item['start']); item['end_fmt'] = fmt_dt(item['end'])
-        
+    decorate_events(data, tz, dt.date())
     return data
 
-def fetch_month_day_data(loc, date_str):
+def fetch_month_day_data(loc, date_str, ayanamsa=None):
     setup_swisseph()
+    ayanamsa = resolve_ayanamsa(ayanamsa)
     dt = datetime.strptime(date_str, "%Y-%m-%d")
     tz = loc['tz']
-    jd_noon = jd_from_dt(tz.localize(datetime(dt.year, dt.month, dt.day, 12, 0)))
-    rise, _ = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
-    rise_next, _ = calc_sun_rise_set(jd_noon + 1, loc['lat'], loc['lon'])
-    sun_long, moon_long = get_pos(rise)
-    tithi_at_sunrise_idx = int(((moon_long - sun_long) % 360) / 12)
-    nak_idx_sunrise = int(moon_long / 13.333333)
-    moon_rashi_idx = int(moon_long / 30)
-    
-    sun_rashi_new_moon = int((sun_long - (tithi_at_sunrise_idx * 1.0)) / 30)
-    lunar_month_name = MONTHS[(sun_rashi_new_moon + 1) % 12]
+    row = get_store_row(loc, dt, ayanamsa)
+    if row is not None:
+        rise = float(row['rise'])
+        tithi_at_sunrise_idx, nak_idx_sunrise = int(row['tithi']), int(row['nakshatra'])
+        t_start, t_end, n_end = float(row['tithi_start']), float(row['tithi_end']), float(row['nak_end'])
+        sun_long = moon_rashi_idx = None
+    else:
+        jd_noon = jd_from_dt(tz.localize(datetime(dt.year, dt.month, dt.day, 12, 0)))
+        rise, _ = calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])
+        rise_next, _ = calc_sun_rise_set(jd_noon + 1, loc['lat'], loc['lon'])
+        sun_long, moon_long = get_pos(rise, ayanamsa)
+        tithi_at_sunrise_idx = int(((moon_long - sun_long) % 360) / 12)
+        nak_idx_sunrise = int(moon_long / 13.333333)
+        moon_rashi_idx = int(moon_long / 30)
 
-    fn_tithi = lambda j: (int((get_pos(j)[1] - get_pos(j)[0]) % 360 / 12), 0)
-    fn_nak = lambda j: (int(get_pos(j)[1] / 13.333333333), 0)
+        fn_tithi = lambda j: (int(elongation(j) / 12), 0)
+        fn_nak = lambda j: (int(graha_longitude(j, 1, ayanamsa) / 13.333333333), 0)
+        
+        tithi_events = get_events(rise, rise_next, fn_tithi, TITHIS, 30)
+        nak_events = get_events(rise, rise_next, fn_nak, NAKSHATRAS, 27)
+        t_start, t_end = tithi_events[0]['start'], tithi_events[0]['end']
+        n_end = nak_events[0]['end']
     
-    tithi_events = get_events(rise, rise_next, fn_tithi, TITHIS, 30)
-    nak_events = get_events(rise, rise_next, fn_nak, NAKSHATRAS, 27)
+    lunar = get_lunar_month_details(rise, ayanamsa)
+    lunar_month_name = ("Adhika " if lunar['is_adhika'] else "") + lunar['name']
     
-    festivals = get_festivals_details(rise, tithi_at_sunrise_idx, sun_long, dt, nak_idx_sunrise, moon_rashi_idx)
+    festivals = get_festivals_details(rise, tithi_at_sunrise_idx, sun_long, dt, nak_idx_sunrise, moon_rashi_idx, ayanamsa)
     
-    def fmt_dt(jd): 
-        d = dt_from_jd(jd, tz)
-        if not d: return "---"
-        return d.strftime('%b %d, %I:%M %p') if d.date() != dt.date() else d.strftime('%I:%M %p')
-
-    t_item = tithi_events[0]
-    tithi_name = t_item['name'].split(' ')[-1]
-    tithi_icon = TITHI_ICONS.get(t_item['name'], "🌑")
-    tithi_start = fmt_dt(t_item['start'])
-    tithi_end = fmt_dt(t_item['end'])
+    fmt_dt = lambda jd: fmt_day_time(jd, tz, dt.date())
+
+    t_name = TITHIS[tithi_at_sunrise_idx]
+    tithi_name = t_name.split(' ')[-1]
+    tithi_icon = TITHI_ICONS.get(t_name, "🌑")
+    tithi_start = fmt_dt(t_start)
+    tithi_end = fmt_dt(t_end)
     
-    n_item = nak_events[0]
-    nak_name = n_item['name']
-    nak_end = fmt_dt(n_item['end'])
+    nak_name = NAKSHATRAS[nak_idx_sunrise]
+    nak_end = fmt_dt(n_end)
     festival_names = [f['name'] for f in festivals]
     
     return {
@@ -689,4 +1276,4 @@ def fetch_month_day_data(loc, date_str):
         "is_festival": len(festivals) > 0,
         "festival_names": festival_names,
         "lunar_month": lunar_month_name
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,58 @@
+import functools
+import os
+import numpy as np
+
+# ================= COLUMNAR DAILY STORE =================
+# One .npy partition per (location, year) holding a fixed-width row per day of
+# the year. Rows that were never computed keep rise = NaN and count as a miss.
+# Kalam ends are not stored: each kalam is (set - rise) / 8 long.
+
+STORE_DTYPE = np.dtype([
+    ('rise', 'f8'), ('set', 'f8'), ('rise_next', 'f8'), ('moon_rise', 'f8'), ('moon_set', 'f8'),
+    ('tithi', 'u1'), ('nakshatra', 'u1'), ('yoga', 'u1'), ('karana', 'u1'),
+    ('tithi_start', 'f8'), ('tithi_end', 'f8'), ('nak_start', 'f8'), ('nak_end', 'f8'),
+    ('yoga_end', 'f8'), ('karana_end', 'f8'),
+    ('rahu_start', 'f8'), ('yama_start', 'f8'), ('guli_start', 'f8'),
+])
+
+def empty_partition(year):
+    days = 366 if (year % 4 == 0 and year % 100 != 0) or year % 400 == 0 else 365
+    rows = np.zeros(days, dtype=STORE_DTYPE)
+    rows['rise'] = np.nan
+    return rows
+
+class PanchangStore:
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def location_key(lat, lon):
+        return f"{lat:+08.4f}_{lon:+09.4f}"
+
+    def partition_path(self, lat, lon, year):
+        return os.path.join(self.root, self.location_key(lat, lon), f"{year}.npy")
+
+    def read_day(self, lat, lon, d):
+        part = _load_partition(self.partition_path(lat, lon, d.year))
+        if part is None: return None
+        row = part[d.timetuple().tm_yday - 1]
+        return None if np.isnan(row['rise']) else row
+
+    def write_days(self, lat, lon, start_date, rows):
+        # Merge consecutive day rows (all within start_date's year) into the partition
+        path = self.partition_path(lat, lon, start_date.year)
+        existing = _load_partition(path)
+        part = np.array(existing) if existing is not None else empty_partition(start_date.year)
+        first = start_date.timetuple().tm_yday - 1
+        part[first:first + len(rows)] = rows
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".part.npy"
+        np.save(tmp, part)
+        os.replace(tmp, path)
+        _load_partition.cache_clear()
+        return path
+
+@functools.lru_cache(maxsize=512)
+def _load_partition(path):
+    if not os.path.exists(path): return None
+    return np.load(path, mmap_mode='r')
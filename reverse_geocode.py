@@ -0,0 +1,104 @@
+import csv
+import math
+import os
+import numpy as np
+
+# ================= OFFLINE REVERSE GEOCODING =================
+# Coordinates from a phone are named after the nearest place in a city table,
+# without a network round trip. Cities are points on the unit sphere, where
+# the straight-line (chord) distance orders neighbours exactly as the
+# great-circle distance does, so a plain k-d tree over the 3-D vectors answers
+# nearest-place queries across the poles and the date line. The bundled table
+# is data/cities.csv (name,country,lat,lon); CITY_TABLE_PATH may point at a
+# larger one in the same format or a GeoNames cities*.txt dump.
+
+EARTH_RADIUS_KM = 6371.0
+CITY_TABLE_PATH = os.environ.get('CITY_TABLE_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cities.csv')
+
+def unit_vectors(lat, lon):
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+class KDTree:
+    # Median splits on the widest axis; nodes are (lo, hi, axis, split, left, right)
+    # over a permutation of the points, leaves have axis -1
+    def __init__(self, points, leaf_size=8):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.arange(len(self.points))
+        self.leaf_size = leaf_size
+        self.nodes = []
+        if len(self.points): self._build(0, len(self.points))
+        # Plain lists: indexing them is far cheaper than indexing arrays one element at a time
+        self._coords, self._order = self.points.tolist(), self.order.tolist()
+
+    def _build(self, lo, hi):
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if hi - lo <= self.leaf_size:
+            self.nodes[node] = (lo, hi, -1, 0.0, -1, -1)
+            return node
+        idx = self.order[lo:hi]
+        pts = self.points[idx]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (hi - lo) // 2
+        self.order[lo:hi] = idx[np.argpartition(pts[:, axis], mid)]
+        split = float(self.points[self.order[lo + mid], axis])
+        left = self._build(lo, lo + mid)
+        right = self._build(lo + mid, hi)
+        self.nodes[node] = (lo, hi, axis, split, left, right)
+        return node
+
+    def query(self, x):
+        # -> (point index, distance) of the nearest point, or (-1, inf) for an empty tree
+        x = tuple(float(v) for v in x)
+        best = [math.inf, -1]
+        points, order, nodes = self._coords, self._order, self.nodes
+        def visit(n):
+            lo, hi, axis, split, left, right = nodes[n]
+            if axis < 0:
+                for i in order[lo:hi]:
+                    p = points[i]
+                    d = (p[0] - x[0]) ** 2 + (p[1] - x[1]) ** 2 + (p[2] - x[2]) ** 2
+                    if d < best[0]: best[:] = d, i
+                return
+            diff = x[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[0]: visit(far)
+        if nodes: visit(0)
+        return int(best[1]), math.sqrt(best[0])
+
+def load_city_table(path=None):
+    # -> (names, lat, lon); "Name, Country" for the CSV, "Name, CC" for GeoNames
+    path = path or CITY_TABLE_PATH
+    names, lats, lons = [], [], []
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.txt'):
+            for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                names.append(f"{row[1]}, {row[8]}"); lats.append(float(row[4])); lons.append(float(row[5]))
+        else:
+            for row in csv.DictReader(f):
+                names.append(f"{row['name']}, {row['country']}"); lats.append(float(row['lat'])); lons.append(float(row['lon']))
+    return names, np.array(lats), np.array(lons)
+
+class CityIndex:
+    def __init__(self, names, lat, lon):
+        self.names, self.lat, self.lon = list(names), np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        self.tree = KDTree(unit_vectors(self.lat, self.lon))
+
+    @classmethod
+    def from_file(cls, path=None):
+        return cls(*load_city_table(path))
+
+    def nearest(self, lat, lon):
+        # -> {"name", "lat", "lon", "distance_km"} of the closest city, or None for an empty table
+        phi, lam = math.radians(lat), math.radians(lon)
+        i, chord = self.tree.query((math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)))
+        if i < 0: return None
+        return {"name": self.names[i], "lat": float(self.lat[i]), "lon": float(self.lon[i]), "distance_km": chord_to_km(chord)}
+
+    def __len__(self):
+        return len(self.names)
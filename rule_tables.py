@@ -0,0 +1,98 @@
+import numpy as np
+
+# ================= COMPILED RULE TABLES =================
+# The weekday/nakshatra yoga rules, baana, netram/jeevan, chandrabalam and
+# tarabalam are dense lookup arrays built once at import. Every lookup is a
+# gather, so the same call works for one nakshatra or for a year of events.
+# Weekdays follow Python (Monday=0).
+
+WEEKDAYS, NAKS, RASHIS_N = 7, 27, 12
+_NAK = np.arange(NAKS)
+_RASHI = np.arange(RASHIS_N)
+
+def _weekday_nak_table(rules):
+    # rules: weekday -> nakshatras for which the yoga holds
+    table = np.zeros((WEEKDAYS, NAKS), dtype=bool)
+    for w, naks in rules.items(): table[w, naks] = True
+    return table
+
+# --- Tamil yoga (Siddha unless the weekday/nakshatra pair is Marana or Amrita) ---
+TAMIL_YOGA_NAMES = np.array(["Siddha", "Marana", "Amrita"], dtype=object)
+TAMIL_MARANA = [(6, 1), (0, 13), (1, 20), (2, 18), (3, 9), (4, 10), (5, 26)]
+TAMIL_AMRITA = [(6, 12), (0, 21), (1, 6), (2, 23), (3, 7), (4, 26), (5, 3)]
+TAMIL_YOGA_TABLE = np.zeros((WEEKDAYS, NAKS), dtype=np.int8)
+for _w, _n in TAMIL_MARANA: TAMIL_YOGA_TABLE[_w, _n] = 1
+for _w, _n in TAMIL_AMRITA: TAMIL_YOGA_TABLE[_w, _n] = 2
+
+# --- Sarvartha siddhi and vidaal yoga ---
+SARVARTHA_TABLE = _weekday_nak_table({6: [12, 7, 18, 11, 20, 25, 0], 0: [21, 3, 4, 7, 16], 1: [0, 2, 4, 8], 2: [3, 16, 12, 2, 4], 3: [7, 16, 2, 6, 26], 4: [26, 16, 0, 6, 21], 5: [3, 14, 21]})
+VIDAAL_TABLE = _weekday_nak_table({6: [1, 13], 0: [13], 1: [20], 2: [18], 3: [9], 4: [10], 5: [26]})
+
+# --- Anandadi yoga: 28 yogas counted from a weekday-dependent start ---
+ANANDADI_NAMES = np.array(["Ananda", "Kaladanda", "Dhumra", "Prajapati", "Soumya", "Dhwalka", "Dhwaja", "Srivatsa", "Vajra", "Mudgara", "Chhatra", "Mitra", "Manasa", "Padma", "Lumba", "Utpata", "Mrityu", "Kana", "Siddhi", "Shubha", "Amrita", "Musala", "Gada", "Matanga", "Rakshasa", "Chara", "Sthira", "Pravardhamana"], dtype=object)
+ANANDADI_OFFSET = np.array([22, 18, 14, 10, 6, 2, 0])
+ANANDADI_TABLE = (_NAK[None, :] + ANANDADI_OFFSET[:, None]) % 28
+
+# --- Baana: sun nakshatra x day nakshatra ---
+BAANA_NAMES = np.array(["Sthira (Good)", "Roga (Bad)", "Agni (Bad)", "Raja (Good)", "Chora (Bad)", "Mrityu (Bad)"], dtype=object)
+BAANA_BY_DISTANCE = np.array([0, 1, 2, 3, 4, 5, 0, 0, 0])
+BAANA_TABLE = BAANA_BY_DISTANCE[(_NAK[None, :] - _NAK[:, None]) % 9]
+
+# --- Netram / jeevan per nakshatra ---
+NETRAM_NAMES = np.array(["Zero Eyes", "One Eye", "Two Eyes"], dtype=object)
+JEEVAN_NAMES = np.array(["Empty Life", "Full Life"], dtype=object)
+NETRAM_BY_REMAINDER = np.array([2, 0, 0, 1, 1, 1, 1, 2, 2])
+NETRAM_TABLE = NETRAM_BY_REMAINDER[(_NAK + 1) % 9]
+JEEVAN_TABLE = (NETRAM_TABLE > 0).astype(np.int8)
+
+# --- Chandrabalam (moon rashi x rashi) and tarabalam (day nakshatra x nakshatra) ---
+CHANDRABALAM_TABLE = ~np.isin((_RASHI[:, None] - _RASHI[None, :]) % 12 + 1, [6, 8, 12])
+TARABALAM_TABLE = np.isin((_NAK[:, None] - _NAK[None, :]) % 9 + 1, [2, 4, 6, 8, 9])
+
+# --- Tripushkara: Sunday/Tuesday/Saturday with a bhadra tithi and a dual-footed nakshatra ---
+TRIPUSHKARA_WEEKDAYS = [1, 5, 6]
+TRIPUSHKARA_TITHIS = [1, 6, 11, 16, 21, 26]
+TRIPUSHKARA_NAKS = [2, 6, 11, 15, 20, 24]
+
+# --- Panchaka: (tithi + weekday + nakshatra + lagna) mod 9, counted from 1 and Sunday=1 ---
+PANCHAKA_NAMES = np.array(["Good Muhurta", "Mrityu Panchaka", "Agni Panchaka", "Good Muhurta", "Raja Panchaka", "Good Muhurta", "Chora Panchaka", "Good Muhurta", "Roga Panchaka"], dtype=object)
+PANCHAKA_GOOD = np.array([True, False, False, True, False, True, False, True, False])
+
+def tamil_yoga(weekday, nak):
+    return TAMIL_YOGA_NAMES[TAMIL_YOGA_TABLE[weekday, nak]]
+
+def sarvartha_siddhi(weekday, nak):
+    return SARVARTHA_TABLE[weekday, nak]
+
+def vidaal_yoga(weekday, nak):
+    return VIDAAL_TABLE[weekday, nak]
+
+def anandadi_yoga(weekday, nak):
+    return ANANDADI_NAMES[ANANDADI_TABLE[weekday, nak]]
+
+def baana_type(sun_nak, nak):
+    return BAANA_NAMES[BAANA_TABLE[sun_nak, nak]]
+
+def netram_jeevan(nak):
+    return NETRAM_NAMES[NETRAM_TABLE[nak]], JEEVAN_NAMES[JEEVAN_TABLE[nak]]
+
+def good_rashis(moon_rashi):
+    return np.flatnonzero(CHANDRABALAM_TABLE[moon_rashi])
+
+def good_taras(day_nak):
+    return np.flatnonzero(TARABALAM_TABLE[day_nak])
+
+def panchaka(tithi, weekday, nak, lagna):
+    remainder = (np.asarray(tithi) + 1 + (np.asarray(weekday) + 1) % 7 + 1 + np.asarray(nak) + 1 + np.asarray(lagna) + 1) % 9
+    remainder = np.asarray(remainder, dtype=np.intp)
+    return PANCHAKA_NAMES[remainder], PANCHAKA_GOOD[remainder]
+
+def nakshatra_rules(weekday, nak, sun_nak):
+    # All weekday/nakshatra rules for arrays of nakshatra events in one pass
+    weekday, nak, sun_nak = np.broadcast_arrays(np.asarray(weekday), np.asarray(nak), np.asarray(sun_nak))
+    netram, jeevan = netram_jeevan(nak)
+    return {
+        "anandadi": anandadi_yoga(weekday, nak), "tamil": tamil_yoga(weekday, nak), "baana": baana_type(sun_nak, nak),
+        "sarvartha": sarvartha_siddhi(weekday, nak), "vidaal": vidaal_yoga(weekday, nak),
+        "netram": netram, "jeevan": jeevan,
+    }
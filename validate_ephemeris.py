@@ -0,0 +1,104 @@
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+import pytz
+import panchang_engine as pe
+
+# ================= EPHEMERIS BACKEND VALIDATION =================
+# Compares every EPHEMERIS_MODES backend against the Swiss Ephemeris files:
+# maximum timing error of tithi/nakshatra transitions and of sunrise over a
+# date range and a spread of latitudes, then a throughput benchmark per mode.
+#
+#   python validate_ephemeris.py --start 2024-01-01 --days 730
+
+LOCATIONS = [
+    {"name": "Chennai", "lat": 13.0827, "lon": 80.2707, "tz": "Asia/Kolkata"},
+    {"name": "Delhi", "lat": 28.6139, "lon": 77.2090, "tz": "Asia/Kolkata"},
+    {"name": "London", "lat": 51.5074, "lon": -0.1278, "tz": "Europe/London"},
+    {"name": "Sydney", "lat": -33.8688, "lon": 151.2093, "tz": "Australia/Sydney"},
+]
+
+def sunrise_table(locations, start, days):
+    out = np.empty((len(locations), days))
+    for i, loc in enumerate(locations):
+        tz = pytz.timezone(loc['tz'])
+        for d in range(days):
+            day = start + timedelta(days=d)
+            jd_noon = pe.jd_from_dt(tz.localize(datetime(day.year, day.month, day.day, 12, 0)))
+            out[i, d] = pe.calc_sun_rise_set(jd_noon, loc['lat'], loc['lon'])[0]
+    return out
+
+def transition_error(reference, table):
+    if len(table['start']) != len(reference['start']) or np.any(table['index'] != reference['index']):
+        return float('inf')
+    return float(np.abs(table['start'] - reference['start']).max() * 86400)
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+def benchmark(start_jd, end_jd, start, bench_days):
+    if pe.EPHEMERIS_MODE == "series": pe.get_ephemeris_series(start_jd)
+    jds = np.linspace(start_jd, end_jd, 20000).tolist()
+    _, t_pos = timed(lambda: [pe.get_pos(jd) for jd in jds])
+    # Re-selecting the mode drops the position, sunrise and lagna memos, so every
+    # call computes (main() has already built this table in this mode)
+    pe.set_ephemeris_mode(pe.EPHEMERIS_MODE)
+    _, t_table = timed(pe.get_transition_table, "tithi", start_jd, end_jd)
+    pe.set_ephemeris_mode(pe.EPHEMERIS_MODE)
+    _, t_rise = timed(sunrise_table, LOCATIONS[:1], start, bench_days)
+    loc = dict(LOCATIONS[0], tz=pytz.timezone(LOCATIONS[0]['tz']))
+    pe.set_ephemeris_mode(pe.EPHEMERIS_MODE)
+    # The lunar month and eclipse chunks are one-off builds, not per-day cost
+    for jd in (start_jd, start_jd + bench_days): pe.get_lunar_month_details(jd)
+    pe.get_eclipse_index(start_jd, start_jd + bench_days)
+    pe.tropical_longitude.cache_clear()
+    _, t_fetch = timed(lambda: [pe.fetch_panchang(loc, (start + timedelta(days=d)).isoformat()) for d in range(bench_days)])
+    return {
+        "sun_moon_position_us": round(t_pos / len(jds) * 1e6, 2),
+        "tithi_table_ms": round(t_table * 1000, 1),
+        "sunrise_ms_per_day": round(t_rise / bench_days * 1000, 3),
+        "fetch_panchang_ms_per_day": round(t_fetch / bench_days * 1000, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and benchmark the ephemeris backends.")
+    parser.add_argument("--start", default="2024-01-01", help="first date, YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--bench-days", type=int, default=14, help="days of fetch_panchang per benchmark")
+    args = parser.parse_args(argv)
+
+    start = date.fromisoformat(args.start)
+    start_jd = pe.jd_from_dt(pytz.utc.localize(datetime(start.year, start.month, start.day)))
+    end_jd = start_jd + args.days
+    pe.setup_swisseph()
+
+    report = {}
+    reference = None
+    for mode in pe.EPHEMERIS_MODES:
+        pe.set_ephemeris_mode(mode)
+        if mode == "series":
+            _, t_build = timed(pe.get_ephemeris_series, start_jd)
+        tables = {kind: pe.get_transition_table(kind, start_jd, end_jd) for kind in ("tithi", "nakshatra")}
+        rises = sunrise_table(LOCATIONS, start, args.days)
+        if reference is None: reference = (tables, rises)
+        entry = {
+            "max_error_s": {
+                "tithi": transition_error(reference[0]['tithi'], tables['tithi']),
+                "nakshatra": transition_error(reference[0]['nakshatra'], tables['nakshatra']),
+                "sunrise": float(np.abs(rises - reference[1]).max() * 86400),
+            },
+            "benchmark": benchmark(start_jd, end_jd, start, args.bench_days),
+        }
+        if mode == "series" and pe._series_file() is None: entry["series_fit_s"] = round(t_build, 2)
+        report[mode] = entry
+    pe.set_ephemeris_mode("swiss")
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
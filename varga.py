@@ -0,0 +1,69 @@
+import numpy as np
+
+# ================= DIVISIONAL CHARTS (VARGAS) =================
+# Every varga is derived arithmetically from sidereal longitudes, so one vector
+# of planet/lagna positions (or a (charts, bodies) matrix in bulk mode) yields
+# all requested D-charts without further ephemeris calls.
+
+VARGA_NAMES = {
+    1: "Rasi", 2: "Hora", 3: "Drekkana", 4: "Chaturthamsa", 7: "Saptamsa", 9: "Navamsa",
+    10: "Dashamsa", 12: "Dwadashamsa", 16: "Shodashamsa", 20: "Vimshamsa", 24: "Chaturvimshamsa",
+    27: "Bhamsa", 30: "Trimshamsa", 40: "Khavedamsa", 45: "Akshavedamsa", 60: "Shashtiamsa"
+}
+
+_SIGNS = np.arange(12)
+_ODD = _SIGNS % 2 == 0          # Aries, Gemini, ... (odd signs counted from 1)
+_MODALITY = _SIGNS % 3           # 0 movable, 1 fixed, 2 dual
+
+# Sign from which the parts of each sign are counted, and the stride between parts
+VARGA_RULES = {
+    1: (_SIGNS, 0),
+    3: (_SIGNS, 4),
+    4: (_SIGNS, 3),
+    7: (np.where(_ODD, _SIGNS, _SIGNS + 6), 1),
+    9: ((_SIGNS * 9) % 12, 1),
+    10: (np.where(_ODD, _SIGNS, _SIGNS + 8), 1),
+    12: (_SIGNS, 1),
+    16: (np.array([0, 4, 8])[_MODALITY], 1),
+    20: (np.array([0, 8, 4])[_MODALITY], 1),
+    24: (np.where(_ODD, 4, 3), 1),
+    27: ((_SIGNS % 4) * 3, 1),
+    40: (np.where(_ODD, 0, 6), 1),
+    45: (np.array([0, 4, 8])[_MODALITY], 1),
+    60: (_SIGNS, 1),
+}
+
+# Trimshamsa: (upper degree bound, sign) for odd and even signs
+TRIMSHAMSA_ODD = ([5, 10, 18, 25, 30], [0, 10, 8, 2, 6])
+TRIMSHAMSA_EVEN = ([5, 12, 20, 25, 30], [1, 5, 11, 9, 7])
+
+def _trimshamsa(sign, deg):
+    odd_part = np.searchsorted(TRIMSHAMSA_ODD[0], deg, side='right')
+    even_part = np.searchsorted(TRIMSHAMSA_EVEN[0], deg, side='right')
+    odd_sign = np.array(TRIMSHAMSA_ODD[1])[np.minimum(odd_part, 4)]
+    even_sign = np.array(TRIMSHAMSA_EVEN[1])[np.minimum(even_part, 4)]
+    return np.where(_ODD[sign], odd_sign, even_sign)
+
+def compute_vargas(longitudes, divisions=tuple(VARGA_NAMES)):
+    lon = np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+    sign = (lon // 30).astype(np.intp)
+    deg = lon - sign * 30.0
+    charts = {}
+    for d in divisions:
+        if d == 2:
+            first_half = deg < 15.0
+            res = np.where(_ODD[sign] == first_half, 4, 3)
+        elif d == 30:
+            res = _trimshamsa(sign, deg)
+        else:
+            start, stride = VARGA_RULES[d]
+            part = np.minimum((deg * d / 30.0).astype(np.intp), d - 1)
+            res = start[sign] + stride * part
+        charts[d] = (res % 12).astype(np.int8)
+    return charts
+
+def varga_chart_data(varga_signs, body_names):
+    chart = {i: [] for i in range(12)}
+    for name, sign in zip(body_names, varga_signs):
+        chart[int(sign)].append(name)
+    return chart